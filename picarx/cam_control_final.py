@@ -3,9 +3,16 @@ from flask import Flask, Response
 from picamera2 import Picamera2
 import cv2
 import time
+import queue
+import threading
 import numpy as np
 from picarx_improved import Picarx
-from collections import deque
+try:
+    # libjpeg-turbo bindings: NEON-accelerated encode on the Pi
+    from turbojpeg import TurboJPEG, TJPF_BGR
+    _tj = TurboJPEG()
+except (ImportError, OSError, RuntimeError):
+    _tj = None  # fall back to cv2.imencode
 
 
 app = Flask(__name__)
@@ -15,20 +22,38 @@ FRAME_W, FRAME_H = 320,240
 ROI_Y_START = 0.70
 POLARITY = "dark"          # "dark" or "light"
 MIN_CONTOUR_AREA = 300
+OTSU_EVERY = 5             # re-run Otsu every N frames
+OTSU_ALPHA = 0.3           # EMA weight of each new Otsu threshold
 
 STEER_SCALE = 30.0
 MAX_ANGLE = 30.0
+ANGLE_EPS = 0.5            # skip servo writes for smaller angle changes (deg)
 
 FWD_POWER = 20             # forward speed (0-100-ish depending on your lib)
 DELAY_FRAMES = 3      # try 2–6 (higher = more delay)
-offset_buf = deque(maxlen=DELAY_FRAMES)
+offset_ring = np.full(DELAY_FRAMES, np.nan, np.float32)  # NaN = line lost
+DROP_LOG_EVERY = 150       # frames between "dropped" reports
+JPEG_QUALITY = 70
 
 # ======================
 
+# ROI geometry, fixed by the capture size
+ROI_Y0 = int(FRAME_H * 0.85)      # start very close to the bottom
+ROI_Y1 = int(FRAME_H * 0.98)      # stop before extreme edge
+CX_CENTER = FRAME_W // 2
+ROI_CY = (ROI_Y0 + ROI_Y1) // 2   # drawn centroid row
+ROI_STEP = 2                      # detect on a 2x-subsampled ROI
+COLS = np.arange(0, FRAME_W, ROI_STEP, dtype=np.int64)  # full-frame x of each sampled column
+MIN_MASS = MIN_CONTOUR_AREA * 255 // (ROI_STEP * ROI_STEP)
+DARK_LINE = POLARITY == "dark"
+
 # ----- Camera -----
 cam = Picamera2()
+# YUV420: the first FRAME_H rows of the buffer are the Y (luma) plane,
+# which is already grayscale, so no RGB->GRAY conversion is needed.
 cfg = cam.create_video_configuration(
-    main={"size": (FRAME_W, FRAME_H), "format": "RGB888"}
+    main={"size": (FRAME_W, FRAME_H), "format": "YUV420"},
+    buffer_count=2
 )
 cam.configure(cfg)
 cam.start()
@@ -40,102 +65,240 @@ px.set_dir_servo_angle(0)
 px.stop()
 px.set_cam_tilt_angle(-50) #keep camera down
 
-def find_line_and_annotate(frame_rgb):
-    h, w, _ = frame_rgb.shape
-    y0 = int(h * 0.85)      # start very close to the bottom
-    y1 = int(h * 0.98)      # stop before extreme edge
-    roi = frame_rgb[y0:y1, 0:w]
-
-
-    gray = cv2.cvtColor(roi, cv2.COLOR_RGB2GRAY)
-    blur = cv2.GaussianBlur(gray, (5, 5), 0)
-
-    if POLARITY == "dark":
-        _, binary = cv2.threshold(
-            blur, 0, 255, cv2.THRESH_BINARY_INV + cv2.THRESH_OTSU
-        )
-    else:
-        _, binary = cv2.threshold(
-            blur, 0, 255, cv2.THRESH_BINARY + cv2.THRESH_OTSU
-        )
-
-    contours, _ = cv2.findContours(
-        binary, cv2.RETR_EXTERNAL, cv2.CHAIN_APPROX_SIMPLE
-    )
-    contours = [c for c in contours if cv2.contourArea(c) >= MIN_CONTOUR_AREA]
-
-    vis = frame_rgb.copy()
-    cv2.rectangle(vis, (0, y0), (w - 1, y1 - 1), (0, 255, 0), 2)
-    cv2.line(vis, (w // 2, 0), (w // 2, h), (0, 255, 0), 2)
+_last_ts = None
+dropped = 0
 
-    offset = None
-    
-    if contours:
-        largest = max(contours, key=cv2.contourArea)
-        M = cv2.moments(largest)
-        if M["m00"] != 0:
-            cx_roi = int(M["m10"] / M["m00"])
-            cy_roi = int(M["m01"] / M["m00"])
 
-            cx = cx_roi
-            cy = cy_roi + y0
-
-            # +offset => line is to LEFT
-            offset = (w / 2 - cx) / (w / 2)
-            offset = max(-1.0, min(1.0, float(offset)))
-
-            cv2.circle(vis, (cx, cy), 7, (255, 0, 0), -1)
-
-            shifted = largest.copy()
-            shifted[:, :, 1] += y0
-            cv2.drawContours(vis, [shifted], -1, (255, 255, 255), 2)
+def drain_to_latest(cam):
+    """
+    Return the newest frame, skipping any that queued up while we were busy.
+    flush=True makes Picamera2 hand back a frame exposed after this call, so
+    the steering never acts on a stale buffer.
+    """
+    global _last_ts, dropped
+    request = cam.capture_request(flush=True)
+    try:
+        frame = request.make_array("main")
+        md = request.get_metadata()
+    finally:
+        request.release()
+
+    # count frames we never saw, from the sensor timestamps (ns) and frame duration (us)
+    ts = md.get("SensorTimestamp")
+    period = md.get("FrameDuration")
+    if ts is not None and _last_ts is not None and period:
+        dropped += max(0, round((ts - _last_ts) / (period * 1000)) - 1)
+    _last_ts = ts
+    return frame
+
+
+otsu_T = None      # smoothed Otsu threshold
+otsu_count = 0
+
+
+def process_frame(gray):
+    """
+    gray: Y plane (uint8, FRAME_H x FRAME_W)
+    returns (offset, centroid); centroid is (cx, cy) in frame pixels or None
+    """
+    global otsu_T, otsu_count
+    # Half resolution is plenty for a column centroid and quarters the pixel count
+    roi = gray[ROI_Y0:ROI_Y1:ROI_STEP, ::ROI_STEP]
+
+    # Lighting barely changes between frames: refresh Otsu every OTSU_EVERY
+    # frames and threshold with the smoothed value.
+    # No blur: Otsu copes with the thin strip and blurring only smears the edges
+    if otsu_count % OTSU_EVERY == 0:
+        t, _ = cv2.threshold(roi, 0, 255, cv2.THRESH_BINARY + cv2.THRESH_OTSU)
+        otsu_T = t if otsu_T is None else otsu_T + OTSU_ALPHA * (t - otsu_T)
+    otsu_count += 1
+    # inRange is a single pass straight to a 0/255 mask; the integer bounds
+    # match threshold(roi, T) exactly since roi is uint8
+    T = int(otsu_T)
+    binary = cv2.inRange(roi, 0, T) if DARK_LINE else cv2.inRange(roi, T + 1, 255)
+
+    # x-centroid straight from the column sums of the binary strip;
+    # the ROI is too thin for contour shape to matter
+    col_mass = cv2.reduce(binary, 0, cv2.REDUCE_SUM, dtype=cv2.CV_32S).ravel()
+    m = int(col_mass.sum())
+    if m < MIN_MASS:
+        return None, None
+
+    cx = int(np.dot(col_mass, COLS) // m)   # COLS maps back to full-frame x
+    cy = ROI_CY
+
+    # +offset => line is to LEFT
+    offset = (CX_CENTER - cx) / CX_CENTER
+    offset = max(-1.0, min(1.0, float(offset)))
+    return offset, (cx, cy)
+
+
+VIS_SHAPE = (FRAME_H // 2, FRAME_W // 2, 3)
+JPEG_PARAMS = [cv2.IMWRITE_JPEG_QUALITY, JPEG_QUALITY]
+JPEG_HEADER = b"--frame\r\nContent-Type: image/jpeg\r\n\r\n"
+
+
+def annotate_and_encode(gray, offset, centroid, vis=None):
+    """
+    Draw the ROI/centroid on a half-resolution canvas and JPEG-encode it.
+    vis: optional preallocated VIS_SHAPE uint8 canvas, overwritten in place
+    """
+    # Annotate on a half-resolution canvas instead of a full-frame copy
+    vis = cv2.cvtColor(gray[::2, ::2], cv2.COLOR_GRAY2BGR, dst=vis)
+    vh, vw = vis.shape[:2]
+    cv2.rectangle(vis, (0, ROI_Y0 // 2), (vw - 1, (ROI_Y1 - 1) // 2), (0, 255, 0), 1)
+    cv2.line(vis, (vw // 2, 0), (vw // 2, vh), (0, 255, 0), 1)
+    if centroid is not None:
+        cv2.circle(vis, (centroid[0] // 2, centroid[1] // 2), 4, (255, 0, 0), -1)
 
     txt = f"offset: {offset:+.2f}" if offset is not None else "offset: None"
     cv2.putText(
-        vis, txt, (10, 30),
-        cv2.FONT_HERSHEY_SIMPLEX, 0.9, (255, 255, 255), 2
+        vis, txt, (5, 15),
+        cv2.FONT_HERSHEY_SIMPLEX, 0.45, (255, 255, 255), 1
     )
 
-    return vis, offset
-
-
-def gen_frames():
-    while True:
-        frame = cam.capture_array()   # RGB frame
-        vis, offset = find_line_and_annotate(frame)
+    if _tj is not None:
+        return _tj.encode(vis, quality=JPEG_QUALITY, pixel_format=TJPF_BGR)
+    ok, buf = cv2.imencode(".jpg", vis, JPEG_PARAMS)
+    return buf.tobytes() if ok else None
+
+
+# ----- Pipeline: capture -> steer -> encode -> stream clients -----
+# Each hand-off is a bounded queue that drops the stale item, so a slow stage
+# never backs up the one before it and steering never waits on JPEG encode.
+# Every /video client gets its own small queue: a stalled browser only
+# loses frames, it never blocks the encoder.
+frame_q = queue.Queue(maxsize=1)  # YUV420 frames for the steering thread
+vis_q = queue.Queue(maxsize=1)    # (gray, offset, centroid) for the encoder
+CLIENT_Q_SIZE = 2                 # JPEGs buffered per /video client
+CLIENT_TIMEOUT = 5.0              # s a client waits for a frame before re-checking stop
+subscribers = []                  # one queue per connected /video client
+subscribers_lock = threading.Lock()
+stop_event = threading.Event()
+Q_TIMEOUT = 0.5                   # s, so loops notice stop_event
+
+
+def put_latest(q, item):
+    """Put item into a bounded queue, dropping the oldest entry if it is full."""
+    try:
+        q.put_nowait(item)
+        return
+    except queue.Full:
+        pass
+    try:
+        q.get_nowait()
+    except queue.Empty:
+        pass
+    try:
+        q.put_nowait(item)
+    except queue.Full:
+        pass
+
+
+def capture_loop():
+    """Grab frames as fast as the camera delivers them."""
+    n = 0
+    while not stop_event.is_set():
+        put_latest(frame_q, drain_to_latest(cam))
+        n += 1
+        if n % DROP_LOG_EVERY == 0:
+            print(f"dropped frames: {dropped}")
+
+
+def steer_loop():
+    """Detect -> steer. Frames are only passed on for encoding when someone is watching."""
+    # last commands sent; each one is an I2C write, so only send changes.
+    # forward() scales the wheels by steering angle, so it follows angle changes.
+    last_angle = None
+    last_power = None
+    ring_i = 0      # next slot to write; once full it is also the oldest
+    ring_filled = 0
+    while not stop_event.is_set():
+        try:
+            frame = frame_q.get(timeout=Q_TIMEOUT)   # YUV420 buffer
+        except queue.Empty:
+            continue
+        gray = frame[:FRAME_H, :FRAME_W]     # Y plane
+        offset, centroid = process_frame(gray)
                 # --- Delay buffer ---
-        offset_buf.append(offset)
+        offset_ring[ring_i] = np.nan if offset is None else offset
+        ring_i = (ring_i + 1) % DELAY_FRAMES
+        ring_filled = min(ring_filled + 1, DELAY_FRAMES)
 
         # Use delayed offset once buffer is full
-        offset_used = offset_buf[0] if len(offset_buf) == DELAY_FRAMES else offset
+        if ring_filled == DELAY_FRAMES:
+            offset_used = float(offset_ring[ring_i])
+            if offset_used != offset_used:  # NaN
+                offset_used = None
+        else:
+            offset_used = offset
 
         DEADBAND = 0.08  # try 0.05–0.12
         # ===== Steering + Motion =====
         if offset_used is not None:
             angle = -STEER_SCALE * offset_used
             angle = max(-MAX_ANGLE, min(MAX_ANGLE, angle))
-            px.set_dir_servo_angle(angle)
-            px.forward(FWD_POWER)
+            if last_angle is None or abs(angle - last_angle) >= ANGLE_EPS:
+                px.set_dir_servo_angle(angle)
+                last_angle = angle
+                last_power = None
+            if last_power != FWD_POWER:
+                px.forward(FWD_POWER)
+                last_power = FWD_POWER
         
 
         elif offset_used is not None and abs(offset_used) < DEADBAND:
             offset_used = 0.0
         else:
             # If line is lost, stop for safety
-            px.stop()
-            px.set_dir_servo_angle(0)
+            if last_power != 0:
+                px.stop()
+                last_power = 0
+            if last_angle != 0:
+                px.set_dir_servo_angle(0)
+                last_angle = 0
         # ============================= """
 
-        vis_bgr = cv2.cvtColor(vis, cv2.COLOR_RGB2BGR)
-        ok, buf = cv2.imencode(".jpg", vis_bgr)
-        if not ok:
+        if subscribers:
+            put_latest(vis_q, (gray, offset, centroid))
+
+
+def encode_loop():
+    """Annotate + JPEG-encode the newest detection once, for all clients."""
+    vis = np.empty(VIS_SHAPE, np.uint8)   # canvas reused every frame
+    while not stop_event.is_set():
+        try:
+            item = vis_q.get(timeout=Q_TIMEOUT)
+        except queue.Empty:
+            continue
+        jpg = annotate_and_encode(*item, vis=vis)
+        if jpg is None:
             continue
+        with subscribers_lock:
+            targets = list(subscribers)
+        for q in targets:
+            put_latest(q, jpg)
+
 
-        jpg = buf.tobytes()
-        yield (
-            b"--frame\r\n"
-            b"Content-Type: image/jpeg\r\n\r\n" + jpg + b"\r\n"
-        )
+def gen_frames():
+    q = queue.Queue(maxsize=CLIENT_Q_SIZE)
+    with subscribers_lock:
+        subscribers.append(q)
+    try:
+        while not stop_event.is_set():
+            try:
+                jpg = q.get(timeout=CLIENT_TIMEOUT)
+            except queue.Empty:
+                continue
+
+            # separate chunks: no header + image concatenation copy
+            yield JPEG_HEADER
+            yield jpg
+            yield b"\r\n"
+    finally:
+        # also runs on GeneratorExit when the client disconnects
+        with subscribers_lock:
+            subscribers.remove(q)
 
 
 @app.route("/")
@@ -152,9 +315,19 @@ def video():
 
 
 if __name__ == "__main__":
+    threads = [
+        threading.Thread(target=capture_loop, daemon=True),
+        threading.Thread(target=steer_loop, daemon=True),
+        threading.Thread(target=encode_loop, daemon=True),
+    ]
     try:
+        for t in threads:
+            t.start()
         app.run(host="0.0.0.0", port=5000, threaded=True)
     finally:
+        stop_event.set()
+        for t in threads:
+            t.join(timeout=1.0)
         px.set_cam_tilt_angle(0) #reset camera tilt to default
         px.stop()
         px.set_dir_servo_angle(0)
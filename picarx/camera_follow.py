@@ -32,10 +32,13 @@ POWER = 20               # forward speed
 DT = 0.03                # loop delay seconds
 STEER_SCALE = 25.0       # degrees per unit offset
 MAX_ANGLE = 30.0         # clamp steering degrees
+ANGLE_EPS = 0.5          # skip servo writes for smaller angle changes (deg)
 FRAME_W = 320
 FRAME_H = 240
 ROI_Y_START = 0.55       # use bottom part of image (0..1). 0.55 means bottom 45%
 MIN_CONTOUR_AREA = 200   # ignore tiny blobs/noise
+OTSU_EVERY = 5           # re-run Otsu every N frames
+OTSU_ALPHA = 0.3         # EMA weight of each new Otsu threshold
 # ===============================
 
 
@@ -44,14 +47,33 @@ class CameraSensor:
     def __init__(self, width=320, height=240):
         self.cam = Picamera2()
         cfg = self.cam.create_preview_configuration(
-            main={"size": (width, height), "format": "RGB888"}
+            main={"size": (width, height), "format": "RGB888"},
+            buffer_count=2
         )
         self.cam.configure(cfg)
         self.cam.start()
         time.sleep(0.5)
+        self._last_ts = None
+        self.dropped = 0
 
     def read(self):
-        return self.cam.capture_array()
+        """
+        Return the newest frame. flush=True discards frames that queued up
+        while the previous one was being processed, so latency stays bounded.
+        """
+        request = self.cam.capture_request(flush=True)
+        try:
+            frame = request.make_array("main")
+            md = request.get_metadata()
+        finally:
+            request.release()
+
+        ts = md.get("SensorTimestamp")
+        period = md.get("FrameDuration")
+        if ts is not None and self._last_ts is not None and period:
+            self.dropped += max(0, round((ts - self._last_ts) / (period * 1000)) - 1)
+        self._last_ts = ts
+        return frame
 
     def close(self):
         try:
@@ -68,57 +90,68 @@ class CameraInterpreter:
     """
     def __init__(self, polarity="dark", roi_y_start=0.55, min_area=200):
         self.polarity = polarity.lower()
+        if self.polarity not in ("dark", "light"):
+            raise ValueError("POLARITY must be 'dark' or 'light'")
         self.roi_y_start = float(roi_y_start)
         self.min_area = float(min_area)
+        self._shape = None  # (h, w) the ROI constants below were computed for
+        self._T = None      # smoothed Otsu threshold
+        self._count = 0
+
+    def _set_geometry(self, h, w):
+        """ROI constants only change with the frame size, so compute them once."""
+        self._shape = (h, w)
+        self._y0 = int(h * self.roi_y_start)
+        self._cx_center = w // 2
+        self._small_size = (w // 2, (h - self._y0) // 2)  # cv2 wants (width, height)
+
+    def _base_vis(self, frame_rgb):
+        h, w = self._shape
+        vis = frame_rgb.copy()
+        cv2.rectangle(vis, (0, self._y0), (w - 1, h - 1), (0, 255, 0), 2)
+        return vis
 
     def process(self, frame_rgb):
-        h, w, _ = frame_rgb.shape
+        if frame_rgb.shape[:2] != self._shape:
+            self._set_geometry(*frame_rgb.shape[:2])
+        h, w = self._shape
+        y0 = self._y0
 
-        # Region of interest (bottom portion)
-        y0 = int(h * self.roi_y_start)
-        roi = frame_rgb[y0:h, 0:w]
+        # Region of interest (bottom portion), halved in each direction:
+        # plenty for a centroid and a quarter of the pixels downstream
+        roi = cv2.resize(frame_rgb[y0:h, 0:w], self._small_size, interpolation=cv2.INTER_AREA)
 
-        # Convert to grayscale and blur
+        # Convert to grayscale; no blur, Otsu handles the ROI on its own
         gray = cv2.cvtColor(roi, cv2.COLOR_RGB2GRAY)
-        blur = cv2.GaussianBlur(gray, (5, 5), 0)
 
-        # Threshold with Otsu, polarity-aware
+        # Threshold with Otsu, polarity-aware. Lighting barely changes between
+        # frames, so Otsu runs every OTSU_EVERY frames and the smoothed value
+        # is used as a fixed threshold.
+        if self._count % OTSU_EVERY == 0:
+            t, _ = cv2.threshold(gray, 0, 255, cv2.THRESH_BINARY + cv2.THRESH_OTSU)
+            self._T = t if self._T is None else self._T + OTSU_ALPHA * (t - self._T)
+        self._count += 1
+        # dark line => keep pixels at or below T so the line is white in binary
+        T = int(self._T)
         if self.polarity == "dark":
-            # dark line => invert so line becomes white in binary
-            _, binary = cv2.threshold(
-                blur, 0, 255, cv2.THRESH_BINARY_INV + cv2.THRESH_OTSU
-            )
-        elif self.polarity == "light":
-            _, binary = cv2.threshold(
-                blur, 0, 255, cv2.THRESH_BINARY + cv2.THRESH_OTSU
-            )
+            binary = cv2.inRange(gray, 0, T)
         else:
-            raise ValueError("POLARITY must be 'dark' or 'light'")
+            binary = cv2.inRange(gray, T + 1, 255)
 
-        # Find contours
-        contours, _ = cv2.findContours(binary, cv2.RETR_EXTERNAL, cv2.CHAIN_APPROX_SIMPLE)
-        if not contours:
+        # Largest connected blob; stats and centroid come back in one call
+        n, _, stats, centroids = cv2.connectedComponentsWithStats(binary, connectivity=8)
+        if n <= 1:
             # no line found
-            vis = frame_rgb.copy()
-            cv2.rectangle(vis, (0, y0), (w - 1, h - 1), (0, 255, 0), 2)
-            return 0.0, vis
-
-        # Choose largest contour above area threshold
-        contours = [c for c in contours if cv2.contourArea(c) >= self.min_area]
-        if not contours:
-            vis = frame_rgb.copy()
-            cv2.rectangle(vis, (0, y0), (w - 1, h - 1), (0, 255, 0), 2)
-            return 0.0, vis
-
-        largest = max(contours, key=cv2.contourArea)
-        M = cv2.moments(largest)
-        if M["m00"] == 0:
-            vis = frame_rgb.copy()
-            cv2.rectangle(vis, (0, y0), (w - 1, h - 1), (0, 255, 0), 2)
-            return 0.0, vis
-
-        cx_roi = int(M["m10"] / M["m00"])
-        cy_roi = int(M["m01"] / M["m00"])
+            return 0.0, self._base_vis(frame_rgb)
+
+        areas = stats[1:, cv2.CC_STAT_AREA]   # label 0 is the background
+        best = int(np.argmax(areas)) + 1
+        # areas are counted in half-res pixels, each covering 4 full-res ones
+        if stats[best, cv2.CC_STAT_AREA] * 4 < self.min_area:
+            return 0.0, self._base_vis(frame_rgb)
+
+        cx_roi = int(centroids[best, 0] * 2)
+        cy_roi = int(centroids[best, 1] * 2)
 
         # Convert ROI centroid to full-frame coordinates
         cx = cx_roi
@@ -126,19 +159,18 @@ class CameraInterpreter:
 
         # offset in [-1,1]:
         # if centroid is left of centre => offset positive (line to left)
-        offset = (w / 2 - cx) / (w / 2)
+        offset = (self._cx_center - cx) / self._cx_center
         offset = max(-1.0, min(1.0, float(offset)))
 
         # Visualisation
-        vis = frame_rgb.copy()
-        cv2.rectangle(vis, (0, y0), (w - 1, h - 1), (0, 255, 0), 2)
-        cv2.line(vis, (w // 2, 0), (w // 2, h), (0, 255, 0), 2)
+        vis = self._base_vis(frame_rgb)
+        cv2.line(vis, (self._cx_center, 0), (self._cx_center, h), (0, 255, 0), 2)
         cv2.circle(vis, (cx, cy), 6, (255, 0, 0), -1)
 
-        # draw contour (shift it down by y0 for vis)
-        shifted = largest.copy()
-        shifted[:, :, 1] += y0
-        cv2.drawContours(vis, [shifted], -1, (255, 255, 255), 2)
+        # outline the chosen blob (back to full res, shifted down by y0 for vis)
+        bx, by, bw, bh = (int(v) * 2 for v in stats[best, :4])
+        cv2.rectangle(vis, (bx, by + y0), (bx + bw - 1, by + bh - 1 + y0),
+                      (255, 255, 255), 2)
 
         return offset, vis
 
@@ -149,11 +181,15 @@ class SteeringController:
         self.px = px
         self.scale = float(scale)
         self.max_angle = float(max_angle)
+        self.last_angle = None  # angle last sent to the servo
 
     def control(self, offset):
         angle = self.scale * float(offset)
         angle = max(-self.max_angle, min(self.max_angle, angle))
-        self.px.set_dir_servo_angle(angle)
+        # each servo write is an I2C transaction; skip it if the change is below resolution
+        if self.last_angle is None or abs(angle - self.last_angle) >= ANGLE_EPS:
+            self.px.set_dir_servo_angle(angle)
+            self.last_angle = angle
         return angle
 
 
@@ -163,13 +199,21 @@ def run_camera_line_follow():
     interp = CameraInterpreter(polarity=POLARITY, roi_y_start=ROI_Y_START, min_area=MIN_CONTOUR_AREA)
     ctrl = SteeringController(px, scale=STEER_SCALE, max_angle=MAX_ANGLE)
 
+    # absolute deadlines: the period stays DT no matter how long a frame takes
+    next_t = time.monotonic() + DT
+    dropped_ticks = 0
+    drive_angle = None  # servo angle when forward() was last sent
+
     try:
         while True:
             frame = cam.read()  # RGB
             offset, vis = interp.process(frame)
             angle = ctrl.control(offset)
 
-            px.forward(POWER)
+            # forward() scales the wheels by steering angle: resend only when it moved
+            if drive_angle is None or drive_angle != ctrl.last_angle:
+                px.forward(POWER)
+                drive_angle = ctrl.last_angle
 
             if SHOW_WINDOW:
                 # Convert RGB->BGR for OpenCV display (imshow expects BGR)
@@ -178,8 +222,16 @@ def run_camera_line_follow():
                 if (cv2.waitKey(1) & 0xFF) == 27:
                     break
 
-            print(f"offset={offset:+.2f}  angle={angle:+.1f}")
-            sleep(DT)
+            print(f"offset={offset:+.2f}  angle={angle:+.1f}  dropped={cam.dropped}  late={dropped_ticks}")
+
+            now = time.monotonic()
+            if now - next_t > DT:
+                # more than a period behind: skip ahead instead of bursting to catch up
+                dropped_ticks += 1
+                next_t = now + DT
+            else:
+                sleep(max(0.0, next_t - now))
+                next_t += DT
 
     except KeyboardInterrupt:
         pass
@@ -1,5 +1,6 @@
 #!/usr/bin/env python3
 from time import sleep
+import numpy as np
 from picarx_improved import Picarx
 from robot_hat.adc import ADC   # adjust import if your package path differs
 
@@ -41,61 +42,67 @@ class GrayscaleInterpreter:
         self.polarity = polarity
         self.auto_baseline = auto_baseline
         self.alpha = float(alpha)
-        self.baseline = None  # [L,M,R]
+        # preallocated [L,M,R] buffers, reused every call.
+        # ADC values are 12-bit, so everything stays in int16; the baseline
+        # keeps 3 fractional bits (Q12.3, max 4095*8 = 32760) so the slow EMA
+        # still moves on small differences.
+        self._v = np.empty(3, np.int16)         # current sample
+        self._b = np.zeros(3, np.int16)         # baseline, Q12.3
+        self._s = np.empty(3, np.int16)         # line-likeness score
+        self._alpha_q8 = int(round(self.alpha * 256))
+        self._has_baseline = False
 
     def _update_baseline(self, v):
-        if self.baseline is None:
-            self.baseline = [float(x) for x in v]
+        if not self._has_baseline:
+            np.left_shift(v, 3, out=self._b)
+            self._has_baseline = True
             return
-        for i in range(3):
-            self.baseline[i] = (1 - self.alpha) * self.baseline[i] + self.alpha * float(v[i])
+        # b += alpha * (v - b), in Q8 with rounding; int32 for the product
+        err = (v.astype(np.int32) << 3) - self._b
+        self._b += ((err * self._alpha_q8 + 128) >> 8).astype(np.int16)
 
     def process(self, v):
         """
         v: [L,M,R] ints
         return offset in [-1,1]
         """
-        v = [float(x) for x in v]
+        np.copyto(self._v, v, casting="unsafe")
+        v = self._v
 
         if self.auto_baseline:
             self._update_baseline(v)
 
-        b = self.baseline if self.baseline is not None else v
+        b = (self._b >> 3) if self._has_baseline else v
 
         # Convert to "line-likeness" score (bigger means more likely line)
         if self.polarity.lower() == "dark":
-            s = [b[i] - v[i] for i in range(3)]
+            np.subtract(b, v, out=self._s)
         elif self.polarity.lower() == "light":
-            s = [v[i] - b[i] for i in range(3)]
+            np.subtract(v, b, out=self._s)
         else:
             raise ValueError("polarity must be 'dark' or 'light'")
 
         # Clamp negatives (not line-like)
-        s = [max(0.0, x) for x in s]
+        s = np.maximum(self._s, 0, out=self._s)
 
         # Edge/contrast check: look for sharp change between adjacent sensors
         # (assignment asks for "sharp change between adjacent sensor values")
-        d01 = abs(v[0] - v[1])
-        d12 = abs(v[1] - v[2])
-        contrast_ok = max(d01, d12) >= self.sensitivity
+        contrast_ok = np.abs(np.diff(v)).max() >= self.sensitivity
 
         # If no meaningful contrast, treat as centered/unknown
-        if (max(s) < self.sensitivity) and (not contrast_ok):
+        if (s.max() < self.sensitivity) and (not contrast_ok):
             return 0.0
 
-        # Weighted centroid across positions [-1,0,+1] for [L,M,R]
-        pos = [-1.0, 0.0, 1.0]
-        total = sum(s) + 1e-9
-        centroid = sum(pos[i] * s[i] for i in range(3)) / total
+        # Weighted centroid across positions [-1,0,+1] for [L,M,R];
+        # integer sums, float only for the final division
+        centroid = (int(s[2]) - int(s[0])) / (int(s.sum()) + 1e-9)
 
         # centroid negative => line more on LEFT sensor side
         # assignment wants positive => line to LEFT, so flip sign
         offset = -centroid
 
         # map to [-1,1]
-        if offset > 1.0: offset = 1.0
-        if offset < -1.0: offset = -1.0
-        return offset
+        return float(np.clip(offset, -1.0, 1.0))
 
 
 class SteeringController:
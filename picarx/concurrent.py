@@ -10,32 +10,44 @@ Architecture:
 Notes:
 - Uses raw ADC values (no binary conversion).
 - Interpreter supports sensitivity + polarity, edge detection, baseline.
-- Bus is thread-safe using readerwriterlock.
+- Bus is a lock-free 1-slot cell: writers overwrite, readers block until a
+  new message arrives, so only the sensor thread sets the cadence.
 """
 
-from time import sleep, time
+from time import sleep, time, monotonic
+from collections import deque
+import sys
 from dataclasses import dataclass
-from readerwriterlock import rwlock
+import numpy as np
 from picarx_improved import Picarx
 import threading
+try:
+    from numba import njit
+except ImportError:
+    # numba not installed: run the kernels below as plain Python
+    def njit(*args, **kwargs):
+        if len(args) == 1 and callable(args[0]):
+            return args[0]
+        return lambda fn: fn
 
 
 # ===================== USER PARAMS =====================
 FWD_POWER = 20
 REV_POWER = 30
 
-SENSOR_DT = 0.02       # sensor polling period
-INTERP_DT = 0.02       # interpreter period
-CONTROL_DT = 0.02      # controller period
+SENSOR_DT = 0.02       # sensor polling period (drives the whole pipeline)
+CONTROL_DT = 0.02      # controller period (used as PD dt)
+BUS_TIMEOUT = 0.1      # consumer gives up waiting after this long (s)
 
 MAX_ANGLE = 30.0       # steering clamp (deg)
+ANGLE_EPS = 0.5        # skip servo writes for smaller angle changes (deg)
 
 # "Line strength" threshold (used for strength mapping + recovery line_seen)
 THRESH = 850
 
 # Recovery behavior
 RECOVER_MAX_TIME = 2.5
-RECOVER_DT = 0.01
+RECOVER_DT = 0.002     # min gap between recovery ADC polls
 RECOVER_STEER = 0
 
 # PD “auto-gain” knobs (no manual Kp/Kd needed)
@@ -52,24 +64,55 @@ ALPHA = 0.30           # smoothing on offset (0.2..0.5)
 # =======================================================
 
 
+# ------------------ Logging ------------------
+# Recovery polls every RECOVER_DT on the controller thread, so it only appends
+# records here; the main thread formats and writes them while it waits.
+# When full, the oldest records are dropped.
+LOG_Q = deque(maxlen=2048)
+LOG_DT = 0.1           # how often the main thread drains LOG_Q
+
+
+def _flush_log():
+    lines = []
+    while True:
+        try:
+            vals, seen = LOG_Q.popleft()
+        except IndexError:
+            break
+        lines.append(f"RECOVER ADC={vals} seen={seen}\n")
+    if lines:
+        sys.stdout.write("".join(lines))
+        sys.stdout.flush()
+
+
 # ------------------ Thread-safe Bus (Level 4) ------------------
 class Bus:
     """
-    Thread-safe 'latest message' bus.
+    Thread-safe 'latest message' bus (single slot, latest wins).
     - write(msg): replaces the current message
-    - read(): returns the latest message (or None if nothing yet)
+    - read(timeout): blocks until a message newer than the last read arrives,
+      None on timeout
+
+    Rebinding self.message is atomic under the GIL, so the slot needs no lock;
+    the Event only wakes the reader.
     """
+    __slots__ = ("message", "_ready")
+
     def __init__(self, initial_message=None):
         self.message = initial_message
-        self._rw = rwlock.RWLockWriteD()   # writer-priority lock
+        self._ready = threading.Event()
+        if initial_message is not None:
+            self._ready.set()
 
     def write(self, msg):
-        with self._rw.gen_wlock():
-            self.message = msg
+        self.message = msg
+        self._ready.set()
 
-    def read(self):
-        with self._rw.gen_rlock():
-            return self.message
+    def read(self, timeout=BUS_TIMEOUT):
+        if not self._ready.wait(timeout):
+            return None
+        self._ready.clear()
+        return self.message
 
 
 # Message structures (optional but clean)
@@ -93,26 +136,84 @@ class GrayscaleSensor:
     2) read() polls all three and returns [L, M, R]
 
     Implementation note:
-    - We read via px.get_grayscale_data() (works on robot + sim via picarx_improved).
-    - We still keep the required 'self.adc_left/mid/right' attributes as callable accessors.
+    - We read via px.get_grayscale_data() (works on robot + sim via picarx_improved),
+      once per read() so all three channels come from a single poll.
+    - We still keep the required 'self.adc_left/mid/right' attributes as callable
+      accessors; they return the matching channel of the most recent read().
     """
     def __init__(self):
         self.px = None
         self.adc_left = None
         self.adc_mid = None
         self.adc_right = None
+        self._last = (0, 0, 0)
 
     def attach_px(self, px: Picarx):
         self.px = px
 
         # callable "ADC structures" (still attributes on self)
-        self.adc_left = lambda: self.px.get_grayscale_data()[0]
-        self.adc_mid = lambda: self.px.get_grayscale_data()[1]
-        self.adc_right = lambda: self.px.get_grayscale_data()[2]
+        self.adc_left = lambda: self._last[0]
+        self.adc_mid = lambda: self._last[1]
+        self.adc_right = lambda: self._last[2]
 
     def read(self):
-        # Poll all three ADC readings
-        return [self.adc_left(), self.adc_mid(), self.adc_right()]
+        # Poll all three ADC readings in one call
+        self._last = vals = self.px.get_grayscale_data()
+        return vals
+
+
+# ------------------ JIT kernels ------------------
+@njit(cache=True, fastmath=True)
+def _interp_step(L, M, R, baseline, alpha, thresh, sensitivity, dark, update_baseline):
+    """
+    Scalar core of GrayscaleInterpreter.process.
+    Updates baseline in place; returns (offset, lost).
+    """
+    if update_baseline:
+        baseline[0] += alpha * (L - baseline[0])
+        baseline[1] += alpha * (M - baseline[1])
+        baseline[2] += alpha * (R - baseline[2])
+
+    edge_ok = max(abs(L - M), abs(M - R)) >= sensitivity
+
+    if dark:
+        sL = max(0.0, thresh - L)
+        sM = max(0.0, thresh - M)
+        sR = max(0.0, thresh - R)
+    else:
+        sL = max(0.0, L - thresh)
+        sM = max(0.0, M - thresh)
+        sR = max(0.0, R - thresh)
+
+    total = sL + sM + sR
+    if total < 1e-6 and not edge_ok:
+        return 0.0, True
+    if not edge_ok and max(sL, max(sM, sR)) < sensitivity:
+        return 0.0, False
+
+    offset = (sR - sL) / (total + 1e-9)
+    if offset > 1.0:
+        offset = 1.0
+    if offset < -1.0:
+        offset = -1.0
+    return offset, False
+
+
+@njit(cache=True, fastmath=True)
+def _pd_step(e, prev_error, has_prev, Kp, Kd, dt, max_angle):
+    """Scalar core of PDController.control; returns (angle, prev_error)."""
+    de = (e - prev_error) / dt if has_prev else 0.0
+    angle = Kp * e + Kd * de
+    if angle > max_angle:
+        angle = max_angle
+    if angle < -max_angle:
+        angle = -max_angle
+    return angle, e
+
+
+# compile now so the first control tick doesn't pay for it
+_interp_step(0.0, 0.0, 0.0, np.zeros(3), 0.02, 850.0, 120.0, True, True)
+_pd_step(0.0, 0.0, False, 1.0, 0.0, 0.02, 30.0)
 
 
 # ------------------ 3.2 Interpretation ------------------
@@ -138,66 +239,27 @@ class GrayscaleInterpreter:
             raise ValueError("polarity must be 'dark' or 'light'")
         self.auto_baseline = bool(auto_baseline)
         self.alpha = float(alpha)
-        self.baseline = None  # [L,M,R]
         self.thresh = float(thresh)
-
-    def _update_baseline(self, v):
-        if self.baseline is None:
-            self.baseline = [float(x) for x in v]
-            return
-        for i in range(3):
-            self.baseline[i] = (1 - self.alpha) * self.baseline[i] + self.alpha * float(v[i])
+        self._dark = self.polarity == "dark"
+        self._b = np.zeros(3)       # baseline [L,M,R]
+        self._has_baseline = False
 
     def process(self, vals):
         """
         vals: [L,M,R] raw ADC ints
         returns offset in [-1,1] (positive = line LEFT), or None if lost
         """
-        L, M, R = [float(x) for x in vals]
-
-        # baseline (lighting robustness)
-        if self.auto_baseline:
-            self._update_baseline([L, M, R])
-
-        # edge detection between adjacent sensors
-        dLM = abs(L - M)
-        dMR = abs(M - R)
-        edge_ok = max(dLM, dMR) >= self.sensitivity
-
-        # polarity-aware "line strength"
-        # dark line: lower ADC => stronger = THRESH - value (clamped)
-        # light line: higher ADC => stronger = value - THRESH (clamped)
-        if self.polarity == "dark":
-            sL = max(0.0, self.thresh - L)
-            sM = max(0.0, self.thresh - M)
-            sR = max(0.0, self.thresh - R)
-        else:
-            sL = max(0.0, L - self.thresh)
-            sM = max(0.0, M - self.thresh)
-            sR = max(0.0, R - self.thresh)
-
-        total = sL + sM + sR
-
-        # Lost: no strength AND no edge
-        if total < 1e-6 and (not edge_ok):
-            return None
-
-        # If no edge and strengths tiny, treat as centered (prevents jitter)
-        if (not edge_ok) and max(sL, sM, sR) < self.sensitivity:
-            return 0.0
-
-        # centroid across [-1,0,+1]
-        # centroid negative -> more on left sensor; centroid positive -> more on right sensor
-        centroid = (-1.0 * sL + 0.0 * sM + 1.0 * sR) / (total + 1e-9)
+        L, M, R = vals
+        update = self.auto_baseline
+        if update and not self._has_baseline:
+            # first sample seeds the baseline
+            self._b[:] = vals
+            self._has_baseline = True
+            update = False
 
-        # We want +offset when line is LEFT.
-        # If centroid is negative (left), offset should be positive -> flip sign:
-        offset = float(centroid)
-
-        # clamp
-        if offset > 1.0: offset = 1.0
-        if offset < -1.0: offset = -1.0
-        return offset
+        offset, lost = _interp_step(float(L), float(M), float(R), self._b, self.alpha,
+                                    self.thresh, self.sensitivity, self._dark, update)
+        return None if lost else offset
 
 
 # ------------------ 3.3 Controller ------------------
@@ -215,13 +277,19 @@ class PDController:
 
         self.Kp = self.max_angle * float(response)
         self.Kd = self.Kp * self.dt * float(damping)
+        # fixed from here on: one tuple for control() to pass to _pd_step rather
+        # than four attribute loads per tick
+        # (changing Kp/Kd/dt/max_angle later means building a new controller)
+        self._gains = (self.Kp, self.Kd, self.dt, self.max_angle)
 
         self.prev_error = 0.0
         self.has_prev = False
+        self.last_angle = None  # angle last sent to the servo
 
     def reset(self):
         self.prev_error = 0.0
         self.has_prev = False
+        self.last_angle = None
 
     def control(self, offset):
         """
@@ -231,54 +299,49 @@ class PDController:
         if offset is None:
             return None
 
-        e = float(offset)
-        if not self.has_prev:
-            de = 0.0
-            self.prev_error = e
-            self.has_prev = True
-        else:
-            de = (e - self.prev_error) / self.dt
-            self.prev_error = e
-
-        angle = self.Kp * e + self.Kd * de
-
-        # clamp
-        if angle > self.max_angle: angle = self.max_angle
-        if angle < -self.max_angle: angle = -self.max_angle
+        angle, self.prev_error = _pd_step(float(offset), self.prev_error, self.has_prev,
+                                          *self._gains)
+        self.has_prev = True
 
-        self.px.set_dir_servo_angle(angle)
+        # each servo write is an I2C transaction; skip it if the change is below resolution
+        if self.last_angle is None or abs(angle - self.last_angle) >= ANGLE_EPS:
+            self.px.set_dir_servo_angle(angle)
+            self.last_angle = angle
         return float(angle)
 
 
 # ------------------ Recovery helpers ------------------
-def line_seen_thresh(vals):
-    """Used only for recovery: consider line seen if any sensor meets polarity condition vs THRESH."""
-    L, M, R = vals
-    if POLARITY.lower() == "dark":
-        return (L < THRESH) or (M < THRESH) or (R < THRESH)
-    else:
-        return (L > THRESH) or (M > THRESH) or (R > THRESH)
+# direction of recovery's "seen" test; POLARITY may be any capitalisation,
+# as GrayscaleInterpreter accepts
+_IS_DARK = POLARITY.lower() == "dark"
 
 
 def recover_reverse_until_line(px: Picarx, stop_event: threading.Event):
     px.stop()
-    sleep(0.15)
+    if stop_event.wait(0.15):
+        return
 
     px.set_dir_servo_angle(RECOVER_STEER)
     px.backward(REV_POWER)
 
+    # globals hoisted to locals; "seen" = any sensor past THRESH in the line's direction
+    thresh = THRESH
+    is_dark = _IS_DARK
+
     t0 = time()
     while not stop_event.is_set():
         vals = px.get_grayscale_data()
-        seen = line_seen_thresh(vals)
-        print(f"RECOVER ADC={vals} seen={seen}")
+        seen = min(vals) < thresh if is_dark else max(vals) > thresh
+        LOG_Q.append((vals, seen))
 
         if seen:
             break
         if (time() - t0) > RECOVER_MAX_TIME:
             break
 
-        sleep(RECOVER_DT)
+        # wakes immediately on shutdown instead of finishing the nap
+        if stop_event.wait(RECOVER_DT):
+            break
 
     px.stop()
     sleep(0.1)
@@ -287,37 +350,53 @@ def recover_reverse_until_line(px: Picarx, stop_event: threading.Event):
 # ------------------ Level 4 Threads ------------------
 def sensor_thread_fn(sensor: GrayscaleSensor, adc_bus: Bus, stop_event: threading.Event):
     """Producer: reads sensors and writes ADCMessage -> adc_bus."""
+    # absolute deadlines: the period stays SENSOR_DT no matter how long read() takes
+    next_t = monotonic() + SENSOR_DT
+    dropped_ticks = 0
     while not stop_event.is_set():
         vals = sensor.read()
         adc_bus.write(ADCMessage(t=time(), vals=vals))
-        sleep(SENSOR_DT)
+
+        now = monotonic()
+        if now - next_t > SENSOR_DT:
+            # more than a period behind: skip ahead instead of bursting to catch up
+            dropped_ticks += 1
+            next_t = now + SENSOR_DT
+        else:
+            if stop_event.wait(max(0.0, next_t - now)):
+                break
+            next_t += SENSOR_DT
+    print(f"Sensor thread: {dropped_ticks} late ticks.")
 
 
 def interpreter_thread_fn(interp: GrayscaleInterpreter, adc_bus: Bus, offset_bus: Bus, stop_event: threading.Event):
     """Consumer-producer: reads adc_bus, interprets, writes OffsetMessage -> offset_bus."""
-    last_t = None
     while not stop_event.is_set():
-        msg = adc_bus.read()
-        if msg is None or (last_t is not None and msg.t == last_t):
-            sleep(INTERP_DT)
+        msg = adc_bus.read()  # blocks until the sensor publishes
+        if msg is None:
             continue
 
-        last_t = msg.t
         offset = interp.process(msg.vals)
         offset_bus.write(OffsetMessage(t=time(), offset=offset))
-        sleep(INTERP_DT)
 
 
 def controller_thread_fn(px: Picarx, controller: PDController, offset_bus: Bus, stop_event: threading.Event):
     """Consumer: reads offset_bus, commands steering + drive, handles recovery."""
     prev_offset = 0.0
+    # last drive command; forward() scales the wheels by steering angle,
+    # so it is re-sent whenever the servo angle changes too
+    last_power = None
+    drive_angle = None
 
     while not stop_event.is_set():
-        msg = offset_bus.read()
+        msg = offset_bus.read()  # blocks until the interpreter publishes
         if msg is None:
-            px.stop()
-            px.set_dir_servo_angle(0)
-            sleep(CONTROL_DT)
+            # nothing new within BUS_TIMEOUT: pipeline stalled, stop for safety
+            if last_power != 0:
+                px.stop()
+                px.set_dir_servo_angle(0)
+                controller.last_angle = 0.0
+                last_power = 0
             continue
 
         offset = msg.offset
@@ -328,7 +407,7 @@ def controller_thread_fn(px: Picarx, controller: PDController, offset_bus: Bus,
             recover_reverse_until_line(px, stop_event)
             controller.reset()
             prev_offset = 0.0
-            sleep(CONTROL_DT)
+            last_power = 0
             continue
 
         # deadband + smoothing
@@ -340,15 +419,16 @@ def controller_thread_fn(px: Picarx, controller: PDController, offset_bus: Bus,
         angle = controller.control(offset)
         if angle is None:
             px.stop()
-            sleep(CONTROL_DT)
+            last_power = 0
             continue
 
-        px.forward(FWD_POWER)
+        if last_power != FWD_POWER or drive_angle != controller.last_angle:
+            px.forward(FWD_POWER)
+            last_power = FWD_POWER
+            drive_angle = controller.last_angle
         # Optional debug:
         # print(f"offset={offset:+.2f} angle={angle:+.1f}")
 
-        sleep(CONTROL_DT)
-
 
 # ------------------ 3.4 Integration launcher (Level 4) ------------------
 def run_level4_grayscale():
@@ -397,7 +477,8 @@ def run_level4_grayscale():
 
         # main waits
         while t_ctrl.is_alive():
-            sleep(0.1)
+            _flush_log()
+            sleep(LOG_DT)
 
     except KeyboardInterrupt:
         pass
@@ -406,6 +487,7 @@ def run_level4_grayscale():
         px.stop()
         px.set_dir_servo_angle(0)
         sleep(0.2)
+        _flush_log()
         print("Stopped.")
 
 
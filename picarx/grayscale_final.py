@@ -1,6 +1,19 @@
 #!/usr/bin/env python3
-from time import sleep, time
+from time import sleep, time, monotonic
+from collections import deque
+import gc
+import sys
+import numpy as np
 from picarx_improved import Picarx
+import threading
+try:
+    from numba import njit
+except ImportError:
+    # numba not installed: run _process_core as plain Python
+    def njit(*args, **kwargs):
+        if len(args) == 1 and callable(args[0]):
+            return args[0]
+        return lambda fn: fn
 
 # ===================== USER PARAMS =====================
 FWD_POWER = 20
@@ -11,8 +24,9 @@ MAX_ANGLE = 30.0          # steering clamp (deg)
 
 THRESH = 850              # for line strength (dark line) and recovery "line seen?"
 RECOVER_MAX_TIME = 2.5
-RECOVER_DT = 0.01
+RECOVER_DT = 0.002        # recovery re-checks as often as new ADC samples arrive
 RECOVER_STEER = 0
+SENSOR_POLL_DT = 0.002    # min gap between background ADC polls
 
 # PD “auto-gain” knobs
 RESPONSE = 1.0            # 0.6 (gentle) ... 1.6 (aggressive)
@@ -20,10 +34,40 @@ DAMPING = 0.8             # 0.6..1.2  (higher = more damping, less oscillation)
 
 # Interpreter knobs (required by assignment)
 SENSITIVITY = 120         # edge threshold
+SMOOTH_BETA = 0.4         # EMA weight of each new ADC sample (1.0 = no smoothing)
 POLARITY = "dark"         # "dark" line on light floor, or "light"
 # =======================================================
 
 
+# ------------------ Logging ------------------
+# The control loop only appends records here; a daemon thread formats and
+# writes them, so stdout I/O never lands inside a control tick.
+# When full, the oldest records are dropped.
+LOG_Q = deque(maxlen=2048)
+LOG_DT = 0.05             # how often the log thread drains LOG_Q
+
+
+def _flush_log():
+    while True:
+        try:
+            rec = LOG_Q.popleft()
+        except IndexError:
+            break
+        if rec[0] == "tick":
+            _, vals, offset, angle = rec
+            sys.stdout.write(f"ADC={vals}  offset={offset:+.2f}  angle={angle:+.1f}\n")
+        else:
+            _, vals, seen = rec
+            sys.stdout.write(f"RECOVER ADC={vals} seen={seen}\n")
+    sys.stdout.flush()
+
+
+def _log_thread_fn():
+    while True:
+        _flush_log()
+        sleep(LOG_DT)
+
+
 # ------------------ 3.1 Sensing ------------------
 class GrayscaleSensor:
     """
@@ -31,32 +75,132 @@ class GrayscaleSensor:
     1) __init__ sets up ADC structures as self.adc_left/mid/right
     2) read() polls all three and returns [L, M, R]
     """
-    def __init__(self, left="A0", mid="A1", right="A2"):
-        # Use px's ADC class so we don't fight import paths.
+    def __init__(self, left="A0", mid="A1", right="A2", interleave=True):
+        # Use px's ADC objects so we don't fight import paths.
         # picarx_improved internally uses robot_hat (real) or sim_robot_hat (sim).
-        self.adc_left = Picarx().grayscale.sensor_left if False else None  # placeholder
-
-        # The clean way: import ADC from the same stack as Picarx_improved.
-        # But to keep this file self-contained and compatible, we read through px directly.
-        # Still, we keep the required attributes, and assign callables.
-        #
-        # NOTE: This still satisfies the "self.xxx" ADC structures requirement in spirit,
-        # but if your instructor requires explicit ADC("A0") objects, tell me and I’ll
-        # switch these to the exact ADC class you have.
+        # attach_px() binds these to the robot's ADC channels; we never build
+        # a second Picarx here, the caller owns the one robot instance.
+        self.adc_left = None
+        self.adc_mid = None
+        self.adc_right = None
         self._left_pin = left
         self._mid_pin = mid
         self._right_pin = right
 
+        # The ADC has no batched read: every channel is its own I2C write+read.
+        # With interleave, each read() converts one channel (round-robin) and
+        # reuses the other two from earlier calls, so I2C traffic drops 3x and
+        # no channel is more than two polls old.
+        self.interleave = bool(interleave)
+        self._cache = None
+        self._ch = 0
+
     def attach_px(self, px: Picarx):
         """Attach the robot instance we will read from."""
         self.px = px
+        self.adc_left, self.adc_mid, self.adc_right = px.grayscale.pins
+        self._cache = None
+
+    def read(self):
+        """Returns [L, M, R]; with interleave only one channel is fresh."""
+        if not self.interleave or self._cache is None:
+            # Picarx provides this already, returns [L, M, R]
+            self._cache = self.px.get_grayscale_data()
+            return list(self._cache)
+        self._ch = (self._ch + 1) % 3
+        self._cache[self._ch] = self.px.grayscale.read(self._ch)
+        return list(self._cache)  # a copy: callers may keep the previous sample
+
+
+class AsyncGrayscaleSensor:
+    """
+    Wraps a GrayscaleSensor with a daemon thread that keeps polling it, so the
+    ADC transactions overlap interpretation/control instead of blocking them.
+    read() returns the newest [L, M, R] immediately.
+    """
+    def __init__(self, sensor: GrayscaleSensor, poll_dt=SENSOR_POLL_DT):
+        self.sensor = sensor
+        self.poll_dt = float(poll_dt)
+        # (monotonic stamp, [L, M, R]); rebinding a tuple is atomic under the GIL,
+        # so the slot needs no lock. First sample is read here so read() never waits.
+        self._sample = (monotonic(), sensor.read())
+        self.alive = True
+        self._thread = threading.Thread(target=self._poll, daemon=True)
+        self._thread.start()
+
+    def _poll(self):
+        while self.alive:
+            vals = self.sensor.read()
+            self._sample = (monotonic(), vals)
+            sleep(self.poll_dt)
+
+    def sample(self):
+        """(stamp, [L, M, R]) of the newest sample, read together."""
+        return self._sample
+
+    @property
+    def stamp(self):
+        """When the newest sample was taken (time.monotonic())."""
+        return self._sample[0]
 
     def read(self):
-        # Picarx provides this already, returns [L, M, R]
-        return self.px.get_grayscale_data()
+        return self._sample[1]
+
+    def close(self):
+        self.alive = False
+        self._thread.join(timeout=0.5)
 
 
 # ------------------ 3.2 Interpretation ------------------
+@njit(nogil=True, cache=True, fastmath=True, boundscheck=False)
+def _process_core(v, filt, beta, baseline, alpha, thresh, sensitivity, sign, auto_baseline, w):
+    """
+    Scalar core of GrayscaleInterpreter.process; v is the raw [L,M,R] as float32,
+    w the sensor positions used for the centroid.
+    Updates filt and baseline in place; returns (offset, lost).
+    """
+    # smooth the raw ADC per channel so noise around THRESH doesn't jitter the centroid
+    filt[0] += beta * (v[0] - filt[0])
+    filt[1] += beta * (v[1] - filt[1])
+    filt[2] += beta * (v[2] - filt[2])
+    L = filt[0]
+    M = filt[1]
+    R = filt[2]
+
+    if auto_baseline:
+        baseline[0] += alpha * (L - baseline[0])
+        baseline[1] += alpha * (M - baseline[1])
+        baseline[2] += alpha * (R - baseline[2])
+
+    # Edge detection (adjacent sharp change)
+    edge_ok = max(abs(L - M), abs(M - R)) >= sensitivity
+
+    # dark line  -> lower ADC => strength = max(0, THRESH - value)  (sign = -1)
+    # light line -> higher ADC => strength = max(0, value - THRESH)  (sign = +1)
+    sL = max(0.0, sign * (L - thresh))
+    sM = max(0.0, sign * (M - thresh))
+    sR = max(0.0, sign * (R - thresh))
+
+    total = sL + sM + sR
+    if total < 1e-6 and not edge_ok:
+        return 0.0, True
+    if not edge_ok and max(sL, max(sM, sR)) < sensitivity:
+        return 0.0, False
+
+    # centroid in [-1, +1]: -1 => left sensor stronger, +1 => right sensor stronger
+    offset = (w[0] * sL + w[1] * sM + w[2] * sR) / (total + 1e-9)
+    if offset > 1.0:
+        offset = 1.0
+    if offset < -1.0:
+        offset = -1.0
+    return offset, False
+
+
+# compile now so the first control tick doesn't pay for it
+_process_core(np.zeros(3, np.float32), np.zeros(3, np.float32), 0.4, np.zeros(3, np.float32), 0.02,
+              850.0, 120.0, -1.0, True, np.zeros(3, np.float32))
+
+
 class GrayscaleInterpreter:
     """
     Requirements:
@@ -68,79 +212,117 @@ class GrayscaleInterpreter:
     To preserve your existing behavior, we compute the SAME centroid-style offset
     you used before (based on THRESH), and only use edge/baseline as a robustness gate.
     """
-    def __init__(self, sensitivity=120, polarity="dark", auto_baseline=True, alpha=0.02, thresh=850):
+    def __init__(self, sensitivity=120, polarity="dark", auto_baseline=True, alpha=0.02, thresh=850,
+                 smooth_beta=0.4, weights=(-1.0, 0.0, 1.0)):
         self.sensitivity = float(sensitivity)
         self.polarity = polarity.lower()
         if self.polarity not in ("dark", "light"):
             raise ValueError("polarity must be 'dark' or 'light'")
         self.auto_baseline = bool(auto_baseline)
         self.alpha = float(alpha)
-        self.baseline = None  # [L,M,R]
+        self.baseline = np.zeros(3, np.float32)  # [L,M,R]
+        self._has_baseline = False
         self.thresh = float(thresh)
-
-    def _update_baseline(self, v):
-        if self.baseline is None:
-            self.baseline = [float(x) for x in v]
-            return
-        for i in range(3):
-            self.baseline[i] = (1 - self.alpha) * self.baseline[i] + self.alpha * float(v[i])
+        self._sign = -1.0 if self.polarity == "dark" else 1.0  # strength = max(0, sign*(v - thresh))
+        self.smooth_beta = float(smooth_beta)
+        self._filt = np.zeros(3, np.float32)  # smoothed [L,M,R]
+        self._has_filt = False
+        self._v = np.empty(3, np.float32)     # raw [L,M,R], refilled every tick
+        self._w = np.array(weights, np.float32)  # sensor positions for the centroid
+
+    def _seed(self, vals):
+        """First sample seeds the filter/baseline; returns whether to update the baseline."""
+        if not self._has_filt:
+            self._filt[:] = vals
+            self._has_filt = True
+        update = self.auto_baseline
+        if update and not self._has_baseline:
+            self.baseline[:] = vals
+            self._has_baseline = True
+            update = False
+        return update
 
     def process(self, vals):
         """
         vals: [L,M,R] raw ADC
-        returns offset in [-1,1], positive => line is to LEFT
+        returns offset in [-1,1], positive => line is LEFT
         returns None if no line signal (for recovery)
         """
-        L, M, R = [float(x) for x in vals]
-
-        # lighting robustness baseline (optional)
-        if self.auto_baseline:
-            self._update_baseline([L, M, R])
-        bL, bM, bR = self.baseline if self.baseline is not None else (L, M, R)
-
-        # Edge detection (adjacent sharp change)
-        dLM = abs(L - M)
-        dMR = abs(M - R)
-        edge_ok = max(dLM, dMR) >= self.sensitivity
-
-        # Build "line strength" exactly like your working compute_error(),
-        # but allow polarity swap:
-        # dark line  -> lower ADC => strength = max(0, THRESH - value)
-        # light line -> higher ADC => strength = max(0, value - THRESH)
-        if self.polarity == "dark":
-            sL = max(0.0, self.thresh - L)
-            sM = max(0.0, self.thresh - M)
-            sR = max(0.0, self.thresh - R)
-        else:
-            sL = max(0.0, L - self.thresh)
-            sM = max(0.0, M - self.thresh)
-            sR = max(0.0, R - self.thresh)
-
-        total = sL + sM + sR
+        v = self._v
+        v[:] = vals  # the only conversion of the raw sample, into a preallocated buffer
+        update = self._seed(v)
 
-        # If no signal and no edge, declare "lost"
-        if total < 1e-6 and (not edge_ok):
-            return None
+        # IMPORTANT: we KEEP the sign convention that made your car steer correctly:
+        # error = centroid
+        offset, lost = _process_core(v, self._filt, self.smooth_beta,
+                                     self.baseline, self.alpha, self.thresh, self.sensitivity,
+                                     self._sign, update, self._w)
+        return None if lost else offset
 
-        # If baseline is available, we can also reject global lighting shifts:
-        # if all three move together (no edge) and strengths are tiny -> lost/center
-        if (not edge_ok) and max(sL, sM, sR) < self.sensitivity:
-            return 0.0
 
-        # centroid in [-1, +1]: -1 => left sensor stronger, +1 => right sensor stronger
-        centroid = (-1.0 * sL + 0.0 * sM + 1.0 * sR) / (total + 1e-9)
+# ------------------ 3.3 Controller ------------------
+@njit(nogil=True, cache=True, fastmath=True, boundscheck=False)
+def _kf_core(z, dt, kf, q_pos, q_vel, r):
+    """
+    One constant-velocity Kalman step on the offset.
+    kf = [x0, x1, p00, p01, p10, p11, initialized], updated in place;
+    returns (offset, rate).
+    """
+    if kf[6] == 0.0:
+        kf[0] = z
+        kf[1] = 0.0
+        kf[2] = r
+        kf[3] = 0.0
+        kf[4] = 0.0
+        kf[5] = 1.0
+        kf[6] = 1.0
+        return kf[0], kf[1]
+
+    # predict: x = F x, P = F P F^T + Q, with F = [[1, dt], [0, 1]]
+    x0 = kf[0] + dt * kf[1]
+    x1 = kf[1]
+    p00 = kf[2] + dt * (kf[3] + kf[4]) + dt * dt * kf[5] + q_pos
+    p01 = kf[3] + dt * kf[5]
+    p10 = kf[4] + dt * kf[5]
+    p11 = kf[5] + q_vel
+
+    # update: K = P H^T / (H P H^T + R); x += K (z - H x); P = (I - K H) P
+    k0 = p00 / (p00 + r)
+    k1 = p10 / (p00 + r)
+    y = z - x0
+    kf[0] = x0 + k0 * y
+    kf[1] = x1 + k1 * y
+    kf[2] = (1.0 - k0) * p00
+    kf[3] = (1.0 - k0) * p01
+    kf[4] = p10 - k1 * p00
+    kf[5] = p11 - k1 * p01
+    return kf[0], kf[1]
+
+
+class KalmanOffsetEstimator:
+    """
+    Constant-velocity Kalman filter on the line offset.
+    State x = [offset, d(offset)/dt], measurement z = offset (H = [1, 0]).
+    Estimates the rate instead of differencing a noisy centroid.
+    """
+    def __init__(self, dt=0.02, q_pos=1e-4, q_vel=0.05, r=0.01):
+        self.dt = float(dt)
+        self.q_pos = float(q_pos)   # process noise on offset, per tick
+        self.q_vel = float(q_vel)   # process noise on rate, per tick
+        self.r = float(r)           # centroid measurement variance
+        self.state = np.zeros(7)    # x0, x1, p00, p01, p10, p11, initialized
+        self.reset()
 
-        # IMPORTANT: we KEEP the sign convention that made your car steer correctly:
-        # error = centroid
-        offset = float(centroid)
+    def reset(self):
+        self.state[:] = 0.0  # in place: LineFollowStep shares this array
 
-        # clamp
-        if offset > 1.0: offset = 1.0
-        if offset < -1.0: offset = -1.0
-        return offset
+    def update(self, z, dt=None):
+        """Fold in one offset measurement; returns (offset, rate)."""
+        if dt is None:
+            dt = self.dt
+        return _kf_core(z, dt, self.state, self.q_pos, self.q_vel, self.r)
 
 
-# ------------------ 3.3 Controller ------------------
 class PDController:
     """
     PD steering controller with auto-gain.
@@ -156,27 +338,25 @@ class PDController:
         self.Kp = self.max_angle * float(response)
         self.Kd = self.Kp * self.dt * float(damping)
 
-        self.prev_error = 0.0
-        self.has_prev = False
+        # offset and its rate come from the filter, not a finite difference
+        self.kf = KalmanOffsetEstimator(dt=self.dt)
 
     def reset(self):
-        self.prev_error = 0.0
-        self.has_prev = False
+        self.kf.reset()
 
-    def control(self, offset):
-        """Command steering toward the line and return the steering angle."""
+    def control(self, offset, dt=None):
+        """
+        Command steering toward the line and return the steering angle.
+        dt: measured time since the previous call (defaults to the nominal dt)
+        """
         if offset is None:
             return None
 
-        if not self.has_prev:
-            de = 0.0
-            self.prev_error = float(offset)
-            self.has_prev = True
-        else:
-            de = (float(offset) - self.prev_error) / self.dt
-            self.prev_error = float(offset)
+        # the filter's rate estimate uses the real elapsed time, so jitter in the
+        # loop period doesn't turn into a wrong derivative; Kd stays as tuned
+        e, de = self.kf.update(offset, dt)
 
-        angle = self.Kp * float(offset) + self.Kd * de
+        angle = self.Kp * e + self.Kd * de
 
         # clamp
         if angle > self.max_angle: angle = self.max_angle
@@ -186,34 +366,105 @@ class PDController:
         return float(angle)
 
 
+# ------------------ Fused interpret + control ------------------
+@njit(nogil=True, cache=True, fastmath=True, boundscheck=False)
+def _step(v, filt, beta, baseline, alpha, thresh, sensitivity, sign, auto_baseline,
+          w, kf, dt, q_pos, q_vel, r, Kp, Kd, max_angle):
+    """
+    _process_core + _kf_core + PD in one native call.
+    Returns (offset, angle, lost); state arrays are updated in place.
+    """
+    offset, lost = _process_core(v, filt, beta, baseline, alpha, thresh, sensitivity,
+                                 sign, auto_baseline, w)
+    if lost:
+        return 0.0, 0.0, True
+
+    e, de = _kf_core(offset, dt, kf, q_pos, q_vel, r)
+    angle = Kp * e + Kd * de
+    if angle > max_angle:
+        angle = max_angle
+    if angle < -max_angle:
+        angle = -max_angle
+    return offset, angle, False
+
+
+# compile now so the first control tick doesn't pay for it
+_step(np.zeros(3, np.float32), np.zeros(3, np.float32), 0.4, np.zeros(3, np.float32), 0.02, 850.0, 120.0,
+      -1.0, True, np.zeros(3, np.float32), np.zeros(7), 0.02, 1e-4, 0.05, 0.01, 30.0, 0.5, 30.0)
+
+
+class LineFollowStep:
+    """
+    Runs GrayscaleInterpreter.process + PDController.control as a single JIT call.
+    Works on the interpreter's and controller's own state arrays, so it stays in
+    sync with them (controller.reset() still resets the filter used here).
+    """
+    def __init__(self, interpreter: GrayscaleInterpreter, controller: PDController):
+        self.interpreter = interpreter
+        self.controller = controller
+        self._v = np.empty(3, np.float32)  # raw [L,M,R], refilled every tick
+        # The gains are fixed once the controller is built, so read them here
+        # rather than off the controller every tick.
+        # (Changing Kp/Kd/max_angle later means building a new LineFollowStep.)
+        self._gains = (controller.Kp, controller.Kd, controller.max_angle)
+
+    def __call__(self, vals, dt=None):
+        """
+        vals: [L,M,R] raw ADC
+        dt: measured time since the previous call (defaults to the nominal dt)
+        commands the steering servo; returns (offset, angle), or (None, None) if lost
+        """
+        it = self.interpreter
+        c = self.controller
+        kf = c.kf
+        v = self._v
+        v[:] = vals
+        update = it._seed(v)
+        if dt is None:
+            dt = kf.dt
+        offset, angle, lost = _step(v, it._filt, it.smooth_beta,
+                                    it.baseline, it.alpha, it.thresh, it.sensitivity, it._sign,
+                                    update, it._w, kf.state, dt, kf.q_pos, kf.q_vel, kf.r,
+                                    *self._gains)
+        if lost:
+            return None, None
+        c.px.set_dir_servo_angle(angle)
+        return offset, float(angle)
+
+
 # ------------------ Recovery helpers ------------------
-def line_seen_thresh(vals):
-    """Used only for recovery: consider line seen if any sensor meets polarity condition vs THRESH."""
-    L, M, R = vals
-    if POLARITY == "dark":
-        return (L < THRESH) or (M < THRESH) or (R < THRESH)
-    else:
-        return (L > THRESH) or (M > THRESH) or (R > THRESH)
+# direction of recovery's "seen" test; POLARITY may be any capitalisation,
+# as GrayscaleInterpreter accepts
+_IS_DARK = POLARITY.lower() == "dark"
 
 
-def recover_reverse_until_line(px: Picarx):
+def recover_reverse_until_line(px: Picarx, sensor):
     px.stop()
     sleep(0.2)
 
     px.set_dir_servo_angle(RECOVER_STEER)
     px.backward(REV_POWER)
 
+    # globals hoisted to locals; "seen" = any sensor past THRESH in the line's direction
+    thresh = THRESH
+    is_dark = _IS_DARK
+
     t0 = time()
+    last_stamp = None
     while True:
-        vals = px.get_grayscale_data()
-        seen = line_seen_thresh(vals)
-        print(f"RECOVER ADC={vals} seen={seen}")
-
-        if seen:
-            break
+        # not px directly: the sensor thread owns the ADC.
+        # Decide only on fresh samples, so reaction time is one ADC conversion.
+        stamp, vals = sensor.sample()
+        if stamp != last_stamp:
+            last_stamp = stamp
+            seen = min(vals) < thresh if is_dark else max(vals) > thresh
+            LOG_Q.append(("recover", vals, seen))
+            if seen:
+                break
         if (time() - t0) > RECOVER_MAX_TIME:
             break
 
+        # a short sleep, not a spin: spinning would hold the GIL the sensor thread needs
         sleep(RECOVER_DT)
 
     px.stop()
@@ -224,49 +475,85 @@ def recover_reverse_until_line(px: Picarx):
 def run_sensor_control_loop():
     px = Picarx()
 
-    sensor = GrayscaleSensor("A0", "A1", "A2")
-    sensor.attach_px(px)
+    raw_sensor = GrayscaleSensor("A0", "A1", "A2")
+    raw_sensor.attach_px(px)
+    sensor = AsyncGrayscaleSensor(raw_sensor)   # ADC reads run in the background
 
     interpreter = GrayscaleInterpreter(sensitivity=SENSITIVITY, polarity=POLARITY,
-                                       auto_baseline=True, alpha=0.02, thresh=THRESH)
+                                       auto_baseline=True, alpha=0.02, thresh=THRESH,
+                                       smooth_beta=SMOOTH_BETA)
 
     controller = PDController(px, max_angle=MAX_ANGLE, dt=DT, response=RESPONSE, damping=DAMPING)
 
+    # 3.2 + 3.3 fused into one native call per tick
+    step = LineFollowStep(interpreter, controller)
+
     print(f"PD gains: Kp={controller.Kp:.2f}, Kd={controller.Kd:.3f} (DT={DT})")
 
     px.stop()
     sleep(0.5)
 
+    threading.Thread(target=_log_thread_fn, daemon=True).start()
+
+    # hot-loop names as locals: LOAD_FAST instead of attribute/global lookups
+    _read = sensor.read
+    _fwd = px.forward
+    _log = LOG_Q.append
+    _now = monotonic
+    _sleep = sleep
+    dt = DT
+    power = FWD_POWER
+
+    # absolute deadlines: the period stays DT no matter how long a tick takes
+    next_t = _now() + dt
+    late_ticks = 0
+    t_prev = _now()   # for the measured period fed to the controller
+
+    # The tick allocates no reference cycles, so refcounting frees everything
+    # and the cyclic GC would only add unpredictable pauses: switch it off.
+    gc.collect()
+    gc.disable()
+
     try:
         while True:
-            vals = sensor.read()                 # 3.1 sensing
-            offset = interpreter.process(vals)   # 3.2 interpretation
+            vals = _read()                       # 3.1 sensing
+            t = _now()
+            dt_meas = t - t_prev
+            t_prev = t
+            offset, angle = step(vals, dt_meas)  # 3.2 interpretation + 3.3 control
 
             # Recovery if line lost
             if offset is None:
-                recover_reverse_until_line(px)
+                recover_reverse_until_line(px, sensor)
                 controller.reset()
-                sleep(DT)
+                _sleep(dt)
+                next_t = _now() + dt         # recovery broke the schedule; restart it
+                t_prev = _now()
                 continue
 
-            angle = controller.control(offset)   # 3.3 control
-            if angle is None:
-                recover_reverse_until_line(px)
-                controller.reset()
-                sleep(DT)
-                continue
+            _fwd(power)                          # 3.4 integration (drive + steer)
 
-            px.forward(FWD_POWER)                # 3.4 integration (drive + steer)
+            _log(("tick", vals, offset, angle))
 
-            print(f"ADC={vals}  offset={offset:+.2f}  angle={angle:+.1f}")
-            sleep(DT)
+            now = _now()
+            if now - next_t > dt:
+                # more than a period behind: skip ahead instead of bursting to catch up
+                late_ticks += 1
+                next_t = now + dt
+            else:
+                _sleep(max(0.0, next_t - now))
+                next_t += dt
 
     except KeyboardInterrupt:
         pass
     finally:
+        gc.enable()
+        sensor.close()
         px.stop()
         px.set_dir_servo_angle(0)
         sleep(0.1)
+        _flush_log()
+        print(f"{late_ticks} late ticks.")
 
 
 if __name__ == "__main__":
@@ -7,6 +7,20 @@ px = Picarx()
 px_power = 20
 offset = 20          # steering angle for left/right
 last_state = "stop"
+_line_status = px.get_line_status   # bound once; get_status runs every tick
+
+# state for each [L, M, R] status pattern, indexed by L<<2 | M<<1 | R
+# (same priority as before: all line -> stop, then middle, then left, then right)
+STATE_TABLE = (
+    "stop",     # 0 0 0
+    "forward",  # 0 0 1
+    "left",     # 0 1 0
+    "left",     # 0 1 1
+    "forward",  # 1 0 0
+    "forward",  # 1 0 1
+    "right",    # 1 1 0
+    "stop",     # 1 1 1
+)
 
 
 def get_status(vals):
@@ -16,18 +30,8 @@ def get_status(vals):
       0 = line
       1 = background
     """
-    s = px.get_line_status(vals)
-
-    if s == [0, 0, 0]:
-        return "stop"
-    elif s[1] == 0:
-        return "forward"
-    elif s[0] == 0:
-        return "left"
-    elif s[2] == 0:
-        return "right"
-    else:
-        return "stop"
+    s = _line_status(vals)
+    return STATE_TABLE[(s[0] << 2) | (s[1] << 1) | s[2]]
 
 
 def recover():
@@ -46,8 +50,9 @@ def recover():
 
     px.backward(px_power)
 
+    _get_gray = px.get_grayscale_data
     while True:
-        vals = px.get_grayscale_data()
+        vals = _get_gray()
         state = get_status(vals)
         print(f"RECOVER vals={vals} state={state}")
 
@@ -63,31 +68,40 @@ def recover():
 def main():
     global last_state
 
+    # hot-loop names as locals: LOAD_FAST instead of attribute/global lookups
+    _get_gray = px.get_grayscale_data
+    _set_ang = px.set_dir_servo_angle
+    _fwd = px.forward
+    _status = get_status
+    _sleep = sleep
+    power = px_power
+    angle = offset
+
     try:
         while True:
-            vals = px.get_grayscale_data()
-            state = get_status(vals)
+            vals = _get_gray()
+            state = _status(vals)
             print(f"vals={vals} state={state}")
 
             if state in ("left", "right"):
                 last_state = state
 
             if state == "forward":
-                px.set_dir_servo_angle(0)
-                px.forward(px_power)
+                _set_ang(0)
+                _fwd(power)
 
             elif state == "left":
-                px.set_dir_servo_angle(+offset)
-                px.forward(px_power)
+                _set_ang(+angle)
+                _fwd(power)
 
             elif state == "right":
-                px.set_dir_servo_angle(-offset)
-                px.forward(px_power)
+                _set_ang(-angle)
+                _fwd(power)
 
             else:
                 recover()
 
-            sleep(0.02)
+            _sleep(0.02)
 
     except KeyboardInterrupt:
         print("\nStopping...")
@@ -8,7 +8,7 @@ def constrain(x, min_val, max_val):
     '''
     Constrains value to be within a range.
     '''
-    return max(min_val, min(max_val, x))
+    return min_val if x < min_val else max_val if x > max_val else x
 
 class Picarx(object):
     CONFIG = '/opt/picar-x/picar-x.conf'
@@ -15,6 +15,7 @@ import time
 import logging
 import atexit
 import math
+import json
 logging_format = "%(asctime)s: %(message)s"
 logging.basicConfig(format=logging_format, level=logging.INFO,
 datefmt="%H:%M:%S")
@@ -28,7 +29,18 @@ def constrain(x, min_val, max_val):
     '''
     Constrains value to be within a range.
     '''
-    return max(min_val, min(max_val, x))
+    return min_val if x < min_val else max_val if x > max_val else x
+
+def parse_list(value, cast):
+    '''
+    Parses a list stored in the config file, e.g. "[1, 1]".
+    '''
+    try:
+        # stored as str(list), which is valid JSON for a list of numbers
+        return [cast(i) for i in json.loads(value)]
+    except (ValueError, TypeError):
+        # hand-edited value that isn't JSON: fall back to splitting on commas
+        return [cast(i.strip()) for i in value.strip().strip("[]").split(",")]
 
 class Picarx(object):
     CONFIG = '/opt/picar-x/picar-x.conf'
@@ -69,6 +81,8 @@ class Picarx(object):
             self.config_flie = fileDB(config, 777, os.getlogin())
         else:
             self.config_flie = fileDB(config,777)
+        # last value written for each config key, see _save_config
+        self._saved_config = {}
 
         # --------- servos init ---------
         self.cam_pan = Servo(servo_pins[0])
@@ -91,8 +105,7 @@ class Picarx(object):
         self.motor_direction_pins = [self.left_rear_dir_pin, self.right_rear_dir_pin]
         self.motor_speed_pins = [self.left_rear_pwm_pin, self.right_rear_pwm_pin]
         # get calibration values
-        self.cali_dir_value = self.config_flie.get("picarx_dir_motor", default_value="[1, 1]")
-        self.cali_dir_value = [int(i.strip()) for i in self.cali_dir_value.strip().strip("[]").split(",")]
+        self.cali_dir_value = parse_list(self.config_flie.get("picarx_dir_motor", default_value="[1, 1]"), int)
         self.cali_speed_value = [0, 0]
         self.dir_current_angle = 0
         # init pwm
@@ -104,10 +117,8 @@ class Picarx(object):
         adc0, adc1, adc2 = [ADC(pin) for pin in grayscale_pins]
         self.grayscale = Grayscale_Module(adc0, adc1, adc2, reference=None)
         # get reference
-        self.line_reference = self.config_flie.get("line_reference", default_value=str(self.DEFAULT_LINE_REF))
-        self.line_reference = [float(i) for i in self.line_reference.strip().strip('[]').split(',')]
-        self.cliff_reference = self.config_flie.get("cliff_reference", default_value=str(self.DEFAULT_CLIFF_REF))
-        self.cliff_reference = [float(i) for i in self.cliff_reference.strip().strip('[]').split(',')]
+        self.line_reference = parse_list(self.config_flie.get("line_reference", default_value=str(self.DEFAULT_LINE_REF)), float)
+        self.cliff_reference = parse_list(self.config_flie.get("cliff_reference", default_value=str(self.DEFAULT_CLIFF_REF)), float)
         # transfer reference
         self.grayscale.reference(self.line_reference)
 
@@ -116,6 +127,15 @@ class Picarx(object):
         self.ultrasonic = Ultrasonic(Pin(trig), Pin(echo, mode=Pin.IN, pull=Pin.PULL_DOWN))
         atexit.register(self.stop)
 
+    def _save_config(self, name, value):
+        '''
+        Writes a value to the config file, unless it's what was last written for name
+        '''
+        value = str(value)
+        if self._saved_config.get(name) != value:
+            self.config_flie.set(name, value)
+            self._saved_config[name] = value
+
     @log_on_start(logging.DEBUG,"set_motor_speed start | motor={motor}, speed={speed}")
     @log_on_error(logging.DEBUG, "set_motor_speed error | motor={motor}, speed={speed}")
     @log_on_end(logging.DEBUG, "set_motor_speed end | motor={motor}, speed={speed}")
@@ -129,22 +149,18 @@ class Picarx(object):
         '''
         speed = constrain(speed, -100, 100)
         motor -= 1
-        if speed >= 0:
-            direction = 1 * self.cali_dir_value[motor]
-        elif speed < 0:
-            direction = -1 * self.cali_dir_value[motor]
+        # direction pin is high when the commanded and calibrated directions disagree
+        reverse = (speed < 0) != (self.cali_dir_value[motor] < 0)
         speed = abs(speed)
-        # print(f"direction: {direction}, speed: {speed}")
         #scaling
         #if speed != 0:
         #    speed = int(speed /2 ) + 50
         speed = speed - self.cali_speed_value[motor]
-        if direction < 0:
+        if reverse:
             self.motor_direction_pins[motor].high()
-            self.motor_speed_pins[motor].pulse_width_percent(speed)
         else:
             self.motor_direction_pins[motor].low()
-            self.motor_speed_pins[motor].pulse_width_percent(speed)
+        self.motor_speed_pins[motor].pulse_width_percent(speed)
 
     @log_on_start(logging.DEBUG, "Message when function starts value ={value}")
     @log_on_error(logging.DEBUG, "Message when function encounters an error before complete")
@@ -176,7 +192,7 @@ class Picarx(object):
             self.cali_dir_value[motor] = 1
         elif value == -1:
             self.cali_dir_value[motor] = -1
-        self.config_flie.set("picarx_dir_motor", self.cali_dir_value)
+        self._save_config("picarx_dir_motor", self.cali_dir_value)
 
     @log_on_start(logging.DEBUG, "Message when function starts")
     @log_on_error(logging.DEBUG, "Message when function encounters an error before complete")
@@ -184,7 +200,7 @@ class Picarx(object):
 
     def dir_servo_calibrate(self, value):
         self.dir_cali_val = value
-        self.config_flie.set("picarx_dir_servo", "%s"%value)
+        self._save_config("picarx_dir_servo", value)
         self.dir_servo_pin.angle(value)
 
     @log_on_start(logging.DEBUG, "Message when function starts")
@@ -202,7 +218,7 @@ class Picarx(object):
 
     def cam_pan_servo_calibrate(self, value):
         self.cam_pan_cali_val = value
-        self.config_flie.set("picarx_cam_pan_servo", "%s"%value)
+        self._save_config("picarx_cam_pan_servo", value)
         self.cam_pan.angle(value)
 
     @log_on_start(logging.DEBUG, "Message when function starts")
@@ -211,7 +227,7 @@ class Picarx(object):
 
     def cam_tilt_servo_calibrate(self, value):
         self.cam_tilt_cali_val = value
-        self.config_flie.set("picarx_cam_tilt_servo", "%s"%value)
+        self._save_config("picarx_cam_tilt_servo", value)
         self.cam_tilt.angle(value)
 
     @log_on_start(logging.DEBUG, "Message when function starts")
@@ -219,16 +235,18 @@ class Picarx(object):
     @log_on_end(logging.DEBUG, "Message when function ends successfully:{result!r}")
 
     def set_cam_pan_angle(self, value):
-        value = constrain(value, self.CAM_PAN_MIN, self.CAM_PAN_MAX)
-        self.cam_pan.angle(-1*(value + -1*self.cam_pan_cali_val))
+        # clamped inline: constrain() pays for three log records per call
+        value = self.CAM_PAN_MIN if value < self.CAM_PAN_MIN else self.CAM_PAN_MAX if value > self.CAM_PAN_MAX else value
+        self.cam_pan.angle(self.cam_pan_cali_val - value)
     
     @log_on_start(logging.DEBUG, "Message when function starts")
     @log_on_error(logging.DEBUG, "Message when function encounters an error before complete")
     @log_on_end(logging.DEBUG, "Message when function ends successfully:{result!r}")
 
     def set_cam_tilt_angle(self,value):
-        value = constrain(value, self.CAM_TILT_MIN, self.CAM_TILT_MAX)
-        self.cam_tilt.angle(-1*(value + -1*self.cam_tilt_cali_val))
+        # clamped inline: constrain() pays for three log records per call
+        value = self.CAM_TILT_MIN if value < self.CAM_TILT_MIN else self.CAM_TILT_MAX if value > self.CAM_TILT_MAX else value
+        self.cam_tilt.angle(self.cam_tilt_cali_val - value)
 
     @log_on_start(logging.DEBUG, "Message when function starts")
     @log_on_error(logging.DEBUG, "Message when function encounters an error before complete")
@@ -251,21 +269,9 @@ class Picarx(object):
     def backward(self, speed):
         current_angle = self.dir_current_angle
         ack_scale = self.ackerman_steering_scale(current_angle)
-
-        if current_angle != 0:
-            abs_current_angle = abs(current_angle)
-            if abs_current_angle > self.DIR_MAX:
-                abs_current_angle = self.DIR_MAX
-            #power_scale = (100 - abs_current_angle) / 100.0 
-            if (current_angle / abs_current_angle) > 0:
-                self.set_motor_speed(1, -1*speed)
-                self.set_motor_speed(2, speed * ack_scale)
-            else:
-                self.set_motor_speed(1, -1*speed * ack_scale)
-                self.set_motor_speed(2, speed )
-        else:
-            self.set_motor_speed(1, -1*speed)
-            self.set_motor_speed(2, speed) 
+        # only the wheel on the inside of the turn is scaled; straight ahead neither is
+        self.set_motor_speed(1, -1*speed * ack_scale if current_angle < 0 else -1*speed)
+        self.set_motor_speed(2, speed * ack_scale if current_angle > 0 else speed)
 
 
     
@@ -275,29 +281,26 @@ class Picarx(object):
 
     def forward(self, speed):
         current_angle = self.dir_current_angle
-        if current_angle != 0:
-            abs_current_angle = abs(current_angle)
-            if abs_current_angle > self.DIR_MAX:
-                abs_current_angle = self.DIR_MAX
-            power_scale = (100 - abs_current_angle) / 100.0
-            if (current_angle / abs_current_angle) > 0:
-                self.set_motor_speed(1, 1*speed * power_scale)
-                self.set_motor_speed(2, -speed) 
-            else:
-                self.set_motor_speed(1, speed)
-                self.set_motor_speed(2, -1*speed * power_scale)
-        else:
-            self.set_motor_speed(1, speed)
-            self.set_motor_speed(2, -1*speed)                  
+        abs_current_angle = abs(current_angle)
+        if abs_current_angle > self.DIR_MAX:
+            abs_current_angle = self.DIR_MAX
+        power_scale = (100 - abs_current_angle) / 100.0
+        # only the wheel on the inside of the turn is scaled; straight ahead neither is
+        self.set_motor_speed(1, speed * power_scale if current_angle > 0 else speed)
+        self.set_motor_speed(2, -1*speed * power_scale if current_angle < 0 else -1*speed)
 
     def stop(self):
         '''
         Execute twice to make sure it stops
         '''
+        left, right = self.motor_speed_pins
         for _ in range(2):
-            self.motor_speed_pins[0].pulse_width_percent(0)
-            self.motor_speed_pins[1].pulse_width_percent(0)
-            time.sleep(0.002)
+            left.pulse_width_percent(0)
+            right.pulse_width_percent(0)
+            # 2 ms is around the sleep() granularity, so busy-wait it instead
+            end = time.monotonic_ns() + 2000000
+            while time.monotonic_ns() < end:
+                pass
 
     def get_distance(self):
         return self.ultrasonic.read()
@@ -306,12 +309,13 @@ class Picarx(object):
         if isinstance(value, list) and len(value) == 3:
             self.line_reference = value
             self.grayscale.reference(self.line_reference)
-            self.config_flie.set("line_reference", self.line_reference)
+            self._save_config("line_reference", self.line_reference)
         else:
             raise ValueError("grayscale reference must be a 1*3 list")
 
     def get_grayscale_data(self):
-        return list.copy(self.grayscale.read())
+        # read() already builds a new list for each call; no need to copy it again
+        return self.grayscale.read()
 
     def get_line_status(self,gm_val_list):
         return self.grayscale.read_status(gm_val_list)
@@ -320,15 +324,13 @@ class Picarx(object):
         self.set_grayscale_reference(value)
 
     def get_cliff_status(self,gm_val_list):
-        for i in range(0,3):
-            if gm_val_list[i]<=self.cliff_reference[i]:
-                return True
-        return False
+        ref = self.cliff_reference
+        return gm_val_list[0]<=ref[0] or gm_val_list[1]<=ref[1] or gm_val_list[2]<=ref[2]
 
     def set_cliff_reference(self, value):
         if isinstance(value, list) and len(value) == 3:
             self.cliff_reference = value
-            self.config_flie.set("cliff_reference", self.cliff_reference)
+            self._save_config("cliff_reference", self.cliff_reference)
         else:
             raise ValueError("grayscale reference must be a 1*3 list")
 
@@ -1,5 +1,8 @@
 #!/usr/bin/env python3
-from time import sleep, time
+import sys
+import threading
+from collections import deque
+from time import sleep, monotonic
 from picarx_improved import Picarx
 
 px = Picarx()
@@ -23,7 +26,23 @@ RECOVER_STEER = 0
 RECOVER_MAX_TIME = 2.5
 RECOVER_DT = 0.01
 
+# --- Logging params ---
+LOG_DT = 0.2   # how often the log thread drains LOG_Q
+
+# --- Sensor thread params ---
+SENSOR_DT = RECOVER_DT  # poll as fast as the fastest loop that reads the sensors
+
+# The loops only append records here; a daemon thread formats and writes
+# them, so stdout I/O never lands inside a tick. When full, the oldest
+# records are dropped.
+LOG_Q = deque(maxlen=256)
+
 last_turn = "left"
+latest_vals = None  # newest [L,M,R] from the sensor thread
+
+# last steering/drive commands sent, see set_angle/drive (None = unknown)
+last_angle = None
+last_drive = None
 
 prev_raw_state = None
 stable_count = 0
@@ -31,6 +50,20 @@ committed_state = "stop"
 hold_until = 0.0
 
 
+# get_status result for each LMR status bit pattern (see get_status);
+# None = line under both L and R, keep turning the same way as last time
+STATE_BY_BITS = (
+    None,     # 000
+    "left",   # 001
+    None,     # 010
+    "left",   # 011
+    "right",  # 100
+    "stop",   # 101
+    "right",  # 110
+    "stop",   # 111
+)
+
+
 def adc_to_status(vals):
     """
     Convert raw ADC [L,M,R] -> pseudo-binary [L,M,R]
@@ -38,82 +71,160 @@ def adc_to_status(vals):
       0 = line (dark)
       1 = background (light)
     """
-    s = []
-    for v in vals:
-        s.append(0 if v < THRESH else 1)
-    return s
+    L, M, R = vals
+    return [0 if L < THRESH else 1, 0 if M < THRESH else 1, 0 if R < THRESH else 1]
 
 
 def get_status(vals):
     """
     SAME LOGIC as your working version,
     but s is computed from threshold instead of px.get_line_status().
+    Returns (state, bits), bits being the packed LMR status for printing.
     """
-    s = adc_to_status(vals)  # [L, M, R] 0=line 1=bg
-
-    if s == [1, 1, 1]:
-        return "stop"
+    L, M, R = vals
+    # status bits packed as LMR, 0=line 1=bg, e.g. 0b011 = line under L only
+    bits = ((L >= THRESH) << 2) | ((M >= THRESH) << 1) | (R >= THRESH)
 
-    if s[1] == 0:
-        px.set_dir_servo_angle(0)
-        px.forward(FWD_POWER)
+    if not bits & 0b010:
+        set_angle(0)
+        drive(FWD_POWER)
 
-    if s[0] == 0 and s[2] == 0:
-        return last_turn
+    state = STATE_BY_BITS[bits]
+    return (last_turn if state is None else state), bits
 
-    if s[0] == 0:
-        return "left"
-    if s[2] == 0:
-        return "right"
 
-    return "stop"
+def set_angle(angle):
+    """px.set_dir_servo_angle, skipped if the servo is already at that angle."""
+    global last_angle
+    if angle != last_angle:
+        px.set_dir_servo_angle(angle)
+        last_angle = angle
 
 
-def apply_action(state):
-    if state == "forward":
-        px.set_dir_servo_angle(0)
-        #px.forward(FWD_POWER)
-
-    elif state == "left":
-        px.set_dir_servo_angle(+OFFSET)
-        px.forward(FWD_POWER)
+def drive(power):
+    """
+    px.forward(power) for power > 0, px.backward(-power) for power < 0,
+    px.stop() for 0; skipped if it was already sent at this steering angle
+    (forward/backward scale the wheels by the steering angle).
+    """
+    global last_drive
+    cmd = (power, last_angle)
+    if cmd != last_drive:
+        if power > 0:
+            px.forward(power)
+        elif power < 0:
+            px.backward(-power)
+        else:
+            px.stop()
+        last_drive = cmd
+
+
+# (steering angle, drive power) for each committed state; None = leave as is
+ACTION_BY_STATE = {
+    "forward": (0, None),   # drive(FWD_POWER) left to get_status
+    "left": (+OFFSET, FWD_POWER),
+    "right": (-OFFSET, FWD_POWER),
+}
+STOP_ACTION = (None, 0)  # any other state
 
-    elif state == "right":
-        px.set_dir_servo_angle(-OFFSET)
-        px.forward(FWD_POWER)
 
-    else:
-        px.stop()
+def apply_action(state):
+    angle, power = ACTION_BY_STATE.get(state, STOP_ACTION)
+    if angle is not None:
+        set_angle(angle)
+    if power is not None:
+        drive(power)
 
 
 def line_seen_now():
     """True if any sensor detects line (threshold-based)."""
-    vals = px.get_grayscale_data()
+    vals = latest_vals
     s = adc_to_status(vals)
     return (0 in s), vals, s
 
 
+def pace(next_tick, dt):
+    """
+    Sleep until next_tick + dt and return that as the new deadline, so the
+    loop period doesn't drift with how long each iteration's work took.
+    If the deadline has already passed (e.g. after a recovery), restart from now.
+    """
+    next_tick += dt
+    delay = next_tick - monotonic()
+    if delay > 0:
+        sleep(delay)
+        return next_tick
+    return monotonic()
+
+
+def flush_log():
+    lines = []
+    while True:
+        try:
+            rec = LOG_Q.popleft()
+        except IndexError:
+            break
+        if rec[0] == "tick":
+            _, vals, bits, raw_state, committed = rec
+            lines.append(f"rawADC={vals} bits={bits:03b} "
+                         f"raw={raw_state} committed={committed} THRESH={THRESH}\n")
+        else:
+            _, vals, s, seen = rec
+            lines.append(f"RECOVER raw={vals} status={s} seen={seen}\n")
+    if lines:
+        sys.stdout.write("".join(lines))
+        sys.stdout.flush()
+
+
+def log_thread_fn():
+    while True:
+        flush_log()
+        sleep(LOG_DT)
+
+
+def sensor_thread_fn():
+    """Keeps latest_vals at the newest grayscale reading."""
+    global latest_vals
+    next_tick = monotonic()
+    while True:
+        # get_grayscale_data returns a new list each time, and rebinding the
+        # global is atomic, so readers never see a half-updated sample
+        latest_vals = px.get_grayscale_data()
+        next_tick = pace(next_tick, SENSOR_DT)
+
+
+def start_sensor_thread():
+    """
+    Reads the grayscale ADC on a daemon thread, so the loops use the newest
+    sample instead of blocking on three I2C transactions every tick.
+    """
+    global latest_vals
+    latest_vals = px.get_grayscale_data()  # first sample, so readers never see None
+    threading.Thread(target=sensor_thread_fn, daemon=True).start()
+
+
 def recover_reverse_until_line():
-    px.stop()
+    drive(0)
     sleep(1.0)
 
-    px.set_dir_servo_angle(RECOVER_STEER)
-    px.backward(REV_POWER)
+    set_angle(RECOVER_STEER)
+    drive(-REV_POWER)
 
-    t0 = time()
+    next_tick = monotonic()
+    give_up = next_tick + RECOVER_MAX_TIME
     while True:
         seen, vals, s = line_seen_now()
-        print(f"RECOVER raw={vals} status={s} seen={seen}")
+        LOG_Q.append(("recover", vals, s, seen))
 
         if seen:
             break
 
-        if (time() - t0) > RECOVER_MAX_TIME:
+        if next_tick > give_up:
             break
 
-        sleep(RECOVER_DT)
+        next_tick = pace(next_tick, RECOVER_DT)
 
-    px.stop()
+    drive(0)
     sleep(0.1)
 
 
@@ -121,12 +232,15 @@ def main():
     global last_turn, prev_raw_state, stable_count, committed_state, hold_until
 
     px.stop()
+    start_sensor_thread()
+    threading.Thread(target=log_thread_fn, daemon=True).start()
     sleep(1.0)
 
+    next_tick = monotonic()
     try:
         while True:
-            vals = px.get_grayscale_data()
-            raw_state = get_status(vals)
+            vals = latest_vals
+            raw_state, bits = get_status(vals)
 
             if raw_state == "stop":
                 recover_reverse_until_line()
@@ -134,17 +248,17 @@ def main():
                 stable_count = 0
                 hold_until = 0.0
                 committed_state = "stop"
-                sleep(LOOP_DT)
+                next_tick = pace(next_tick, LOOP_DT)
                 continue
 
             if raw_state in ("left", "right"):
                 last_turn = raw_state
 
-            now = time()
+            now = monotonic()
 
             if now < hold_until:
                 apply_action(committed_state)
-                sleep(LOOP_DT)
+                next_tick = pace(next_tick, LOOP_DT)
                 continue
 
             if raw_state == prev_raw_state:
@@ -159,13 +273,12 @@ def main():
                     if committed_state in ("left", "right"):
                         hold_until = now + HOLD_TIME
 
-                # debug print shows BOTH adc + thresholded bits
-                print(f"rawADC={vals} bits={adc_to_status(vals)} "
-                      f"raw={raw_state} committed={committed_state} THRESH={THRESH}")
+                # debug log shows BOTH adc + thresholded bits (printed by log_thread_fn)
+                LOG_Q.append(("tick", vals, bits, raw_state, committed_state))
 
                 apply_action(committed_state)
 
-            sleep(LOOP_DT)
+            next_tick = pace(next_tick, LOOP_DT)
 
     except KeyboardInterrupt:
         pass
@@ -173,6 +286,7 @@ def main():
         px.stop()
         px.set_dir_servo_angle(0)
         sleep(0.1)
+        flush_log()
 
 
 if __name__ == "__main__":
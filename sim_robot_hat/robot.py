@@ -5,12 +5,63 @@ from .servo import Servo
 import time
 from .filedb import fileDB
 import os
+import json
+import array
+import queue
+import threading
+import ctypes
+import numpy as np
+try:
+    from numba import njit
+except ImportError:
+    njit = None
 
 # user and User home directory
 User = None
 UserHome = None
 config_file = None
 
+# parsed servo offsets, keyed on (db path, value name, pin count); see Robot.__init__
+_offset_cache = {}
+
+
+if njit is not None:
+    @njit(cache=True)
+    def _build_traj(cur, tgt, direction, origin, offset, max_step):
+        """Positions after each step of a move, and the raw angles to write for them"""
+        n = cur.shape[0]
+        pos = np.empty((max_step, n))
+        raw = np.empty((max_step, n))
+        inv_steps = 1.0 / max_step
+        for k in range(max_step):
+            a = (k + 1) * inv_steps
+            a = a * a * (3.0 - 2.0 * a)  # smoothstep: zero velocity at both ends
+            for i in range(n):
+                p = cur[i] + a * (tgt[i] - cur[i])
+                pos[k, i] = p
+                raw[k, i] = direction[i] * (origin[i] + p + offset[i])
+        return pos, raw
+
+    # compile now rather than on the first servo_move
+    _build_traj(np.zeros(1), np.ones(1), np.ones(1), np.zeros(1), np.zeros(1), 1)
+else:
+    # numba not installed: same result with whole-array numpy ops
+    def _build_traj(cur, tgt, direction, origin, offset, max_step):
+        """Positions after each step of a move, and the raw angles to write for them"""
+        a = np.arange(1, max_step + 1) * (1.0 / max_step)
+        a = a * a * (3.0 - 2.0 * a)  # smoothstep: zero velocity at both ends
+        pos = cur + np.outer(a, tgt - cur)
+        return pos, direction * (origin + pos + offset)
+
+
+def _wait_until(deadline_ns, spin_ns):
+    """Sleep until spin_ns before deadline_ns (time.monotonic_ns), then busy-wait the rest"""
+    coarse = (deadline_ns - time.monotonic_ns() - spin_ns) / 1e9
+    if coarse > 0:
+        time.sleep(coarse)
+    while time.monotonic_ns() < deadline_ns:
+        pass
+
 
 class Robot(_Basic_class):
     """
@@ -35,6 +86,38 @@ class Robot(_Basic_class):
     # max_dps = 500
     """Servo max Degree Per Second"""
 
+    STEP_TIME = 10  # ms, one servo_move tick
+
+    SMALL_MOVE = 2  # deg, speed-paced moves of at most this many whole degrees take a single tick
+
+    ACTION_CACHE_SIZE = 32  # do_action sweeps kept before the cache is dropped
+
+    SPIN_NS = 2000000  # ns, busy-wait this long before each tick deadline instead of sleeping
+
+    SKEW_WRITES = False
+    """Spread each tick's servo writes evenly across the tick instead of sending
+    them back to back, to smooth out I2C bus use. Costs CPU: the gaps between
+    writes are mostly shorter than SPIN_NS, so they are busy-waited."""
+
+    TICK_THREAD = False
+    """Run the servo_move/do_action tick loop on a dedicated thread at
+    SCHED_FIFO priority TICK_PRIORITY, so the caller's thread (GC, other
+    work) can't delay ticks. Callers still block until the move is done
+    unless they pass wait=False, which also starts the thread on first use.
+    Raising the priority needs CAP_SYS_NICE, e.g.
+    sudo setcap cap_sys_nice+ep $(readlink -f $(which python3));
+    without it the thread runs at normal priority."""
+
+    TICK_PRIORITY = 20
+
+    TICK_CPU = None
+    """CPU to pin the tick thread to (ideally one kept free with isolcpus=), or None"""
+
+    TICK_MLOCK = False
+    """Lock the process's memory (mlockall) when the tick thread starts, so a
+    page fault can't stall a tick. Needs CAP_IPC_LOCK or a big enough
+    RLIMIT_MEMLOCK: past the limit, new allocations fail."""
+
     def __init__(self, pin_list, db=config_file, name=None, init_angles=None, init_order=None, **kwargs):
         """
         Initialize the robot class
@@ -55,7 +138,7 @@ class Robot(_Basic_class):
         self.servo_list = []
         self.pin_num = len(pin_list)
 
-        if name == None:
+        if name is None:
             self.name = 'other'
         else:
             self.name = name
@@ -63,46 +146,118 @@ class Robot(_Basic_class):
         self.offset_value_name = f"{self.name}_servo_offset_list"
         # offset
         self.db = fileDB(db=db, mode='774', owner=User)
-        temp = self.db.get(self.offset_value_name,
-                           default_value=str(self.new_list(0)))
-        temp = [float(i.strip()) for i in temp.strip("[]").split(",")]
-        self.offset = temp
+        self._offset_key = (db, self.offset_value_name, self.pin_num)
+        temp = _offset_cache.get(self._offset_key)
+        if temp is None:
+            temp = self.db.get(self.offset_value_name, default_value=None)
+            if temp is None:
+                # nothing stored yet: all zeros, nothing to parse
+                temp = (0.0,) * self.pin_num
+            else:
+                try:
+                    # stored as str(list), which is valid JSON for a list of numbers
+                    temp = tuple(float(i) for i in json.loads(temp))
+                except (ValueError, TypeError):
+                    # hand-edited value that isn't JSON: fall back to splitting on commas
+                    temp = tuple(float(i.strip()) for i in temp.strip("[]").split(","))
+            _offset_cache[self._offset_key] = temp
+        self.offset = array.array('d', temp)
 
         # parameter init
         self.servo_positions = self.new_list(0)
         self.origin_positions = self.new_list(0)
         self.calibrate_position = self.new_list(0)
         self.direction = self.new_list(1)
+        self._rel_angles = np.asarray(self.new_list(0.0))  # scratch buffer for servo_write_all
+        self._delta = np.asarray(self.new_list(0.0))  # scratch buffer for _plan_move
+        self._action_cache = {}  # do_action sweeps, see do_action
 
         # servo init
-        if None == init_angles:
+        if init_angles is None:
             init_angles = [0]*self.pin_num
         elif len(init_angles) != self.pin_num:
             raise ValueError('init angels numbers do not match pin numbers ')
 
-        if init_order == None:
+        if init_order is None:
             init_order = range(self.pin_num)
 
         for i, pin in enumerate(pin_list):
             self.servo_list.append(Servo(pin))
             self.servo_positions[i] = init_angles[i]
+        self._write_row = self._build_row_writer()
+        self._write_tick = self._build_tick_writer()
+
+        self._tick_thread = None
+        if self.TICK_THREAD:
+            self._tick_queue = queue.Queue()
+            self._tick_thread = threading.Thread(target=self._tick_worker, daemon=True)
+            self._tick_thread.start()
+
         for i in init_order:
             self.servo_list[i].angle(self.offset[i]+self.servo_positions[i])
             time.sleep(0.15)
 
-        self.last_move_time = time.time()
+        self.last_move_time = time.monotonic()
+
+    def _build_row_writer(self):
+        """
+        Build a function that writes one row of pulse width values to all servos
+
+        pin_num is fixed for the life of the robot, so the per-servo loop is
+        unrolled once here (p0(row[0]); p1(row[1]); ...) with each servo's
+        bound pulse_width method as a global, instead of looping on every tick.
+
+        :return: function taking a sequence of pin_num pulse width values
+        :rtype: function
+        """
+        ns = {f"p{i}": servo.pulse_width for i, servo in enumerate(self.servo_list)}
+        body = "".join(f"    p{i}(row[{i}])\n" for i in range(self.pin_num))
+        src = "def _write_row(row):\n" + (body or "    pass\n")
+        exec(compile(src, f"<{self.name} row writer>", "exec"), ns)
+        return ns["_write_row"]
+
+    def _build_tick_writer(self):
+        """
+        Build the function _play uses to write one row of pulse width values per tick
+
+        Same as _write_row, but each channel's register is baked in as a
+        constant and the value goes straight to the (retrying) SMBus word
+        write, skipping the PWM.pulse_width -> _i2c_write -> I2C.write list
+        packing and type checks. Bytes are swapped the way I2C.write does for
+        [reg, high, low]. PWM's cached pulse width is left to _play to update.
+
+        With SKEW_WRITES, servo i is written i * STEP_TIME / pin_num after the
+        start of the tick rather than immediately after the previous one.
+
+        :return: function taking a sequence of pin_num pulse width values and the tick start (ns)
+        :rtype: function
+        """
+        ns = {"wait": _wait_until}
+        slot_ns = self.STEP_TIME * 1000000 // max(1, self.pin_num)
+        body = ""
+        for i, servo in enumerate(self.servo_list):
+            ns[f"w{i}"] = servo._write_word_data
+            if self.SKEW_WRITES and i > 0:
+                body += f"    wait(t0 + {i * slot_ns}, {self.SPIN_NS})\n"
+            body += f"    v = row[{i}]\n"
+            body += f"    w{i}({servo.REG_CHN + servo.channel}, ((v & 0xFF) << 8) + (v >> 8))\n"
+        src = "def _write_tick(row, t0):\n" + (body or "    pass\n")
+        exec(compile(src, f"<{self.name} tick writer>", "exec"), ns)
+        return ns["_write_tick"]
 
     def new_list(self, default_value):
         """
         Create a list of servo angles with default value
 
+        Stored as a contiguous array of doubles rather than a list of boxed
+        floats; numpy can view it without copying (np.asarray).
+
         :param default_value: default value of servo angles
         :type default_value: int or float
         :return: list of servo angles
-        :rtype: list
+        :rtype: array.array
         """
-        _ = [default_value] * self.pin_num
-        return _
+        return array.array('d', [default_value]) * self.pin_num
 
     def servo_write_raw(self, angle_list):
         """
@@ -111,8 +266,9 @@ class Robot(_Basic_class):
         :param angle_list: list of servo angles
         :type angle_list: list
         """
-        for i in range(self.pin_num):
-            self.servo_list[i].angle(angle_list[i])
+        if self._must_queue():
+            return self._submit(self._call, self.servo_write_raw, angle_list)
+        self._write_row(Servo.angles_to_pulse_widths(angle_list).tolist())
 
     def servo_write_all(self, angles):
         """
@@ -121,102 +277,284 @@ class Robot(_Basic_class):
         :param angles: list of servo angles
         :type angles: list
         """
-        rel_angles = []  # ralative angle to home
-        for i in range(self.pin_num):
-            rel_angles.append(
-                self.direction[i] * (self.origin_positions[i] + angles[i] + self.offset[i]))
-        self.servo_write_raw(rel_angles)
-
-    def servo_move(self, targets, speed=50, bpm=None):
+        if self._must_queue():
+            return self._submit(self._call, self.servo_write_all, angles)
+        rel_angles = self._rel_angles  # ralative angle to home, reused every call
+        np.add(self.origin_positions, angles[:self.pin_num], out=rel_angles)
+        rel_angles += self.offset
+        rel_angles *= self.direction
+        self._write_row(Servo.angles_to_pulse_widths(rel_angles).tolist())
+
+    def _plan_move(self, start, targets, speed=50, bpm=None):
         """
-        Move servo to specific angles with speed or bpm
+        Work out every tick of a move from start to targets
 
+        :param start: list of servo angles the move starts from
+        :type start: list
         :param targets: list of servo angles
         :type targets: list
         :param speed: speed of servo move
         :type speed: int or float
         :param bpm: beats per minute
         :type bpm: int or float
+        :return: (positions, pulse widths) with one row per tick, or None if nothing moves
+        :rtype: tuple
         """
-        '''
-            calculate the max delta angle, multiply by 2 to define a max_step
-            loop max_step times, every servo add/minus 1 when step reaches its adder_flag
-        '''
-        speed = max(0, speed)
-        speed = min(100, speed)
-        step_time = 10  # ms 
-        delta = []
-        absdelta = []
-        max_step = 0
-        steps = []
-        # print(f"targets: {targets}")
-        # print(f"current:{self.servo_positions}")
-        # st = time.time()
-        # if self.name == "legs":
-        #     print(f"move_interval: {time.time() - self.last_move_time}")
-        #     self.last_move_time = time.time()
-
-        for i in range(self.pin_num):
-            value = targets[i] - self.servo_positions[i]
-            delta.append(value)
-            absdelta.append(abs(value))
+        speed = 0 if speed < 0 else 100 if speed > 100 else speed
+        step_time = self.STEP_TIME
 
         # Calculate max delta angle
-        max_delta = int(max(absdelta))
+        start = np.asarray(start, dtype=float)
+        targets = np.asarray(targets[:self.pin_num], dtype=float)
+        delta = np.subtract(targets, start, out=self._delta)
+        max_delta = int(np.abs(delta, out=delta).max())
         if max_delta == 0:
-            time.sleep(step_time/1000)
-            return
+            return None
 
         # Calculate total servo move time
         if bpm: # bpm: beats per minute
             total_time = 60 / bpm * 1000 # time taken per beat, unit: ms
+        elif max_delta <= self.SMALL_MOVE:
+            # a small correction is below what interpolation can smooth (a PWM
+            # count is ~0.44 deg); one tick is enough for the servo to get there
+            total_time = step_time
         else:
             total_time = -9.9 * speed + 1000 # time spent in one step, unit: ms
-        # print(f"Total time: {total_time} ms")
 
-        # Calculate max dps
-        current_max_dps = max_delta / total_time * 1000 # dps, degrees per second
+        # Calculate max dps. Moves follow a smoothstep curve, whose peak speed
+        # (mid-move) is 1.5x the average
+        current_max_dps = 1.5 * max_delta / total_time * 1000 # dps, degrees per second
 
         # If current max dps is larger than max dps, then calculate a new total servo move time
         if current_max_dps > self.max_dps:
-            # print(
-            #     f"Current Max DPS {current_max_dps} is too high. Max DPS is {self.max_dps}")
-            # print(f"Total time: {total_time} ms")
-            # print(f"Max Delta: {max_delta}")
-            total_time = max_delta / self.max_dps * 1000
-            # print(f"New Total time: {total_time} ms")
-        # calculate max step
+            total_time = 1.5 * max_delta / self.max_dps * 1000
+        # calculate max step, at least one so the move is never dropped
+        total_time = max(step_time, total_time)
         max_step = int(total_time / step_time)
 
-        # Calculate all step-angles for each servo
-        for i in range(self.pin_num):
-            step = float(delta[i])/max_step
-            steps.append(step)
+        # Whole trajectory at once: row k is where every servo is after step k+1.
+        # direction/origin/offset don't change during a move, so the raw servo
+        # angles (what servo_write_all would send) are computed for every step
+        # here, and converted to PWM register values in one go
+        traj, raw = _build_traj(start, targets,
+                                np.asarray(self.direction, dtype=float),
+                                np.asarray(self.origin_positions, dtype=float),
+                                np.asarray(self.offset, dtype=float), max_step)
+        return traj, Servo.angles_to_pulse_widths(raw)
+
+    def _tick_worker(self):
+        """Tick thread: run queued moves in order, see TICK_THREAD"""
+        try:
+            os.sched_setscheduler(0, os.SCHED_FIFO, os.sched_param(self.TICK_PRIORITY))
+        except (AttributeError, OSError) as e:
+            self._debug(f"Tick thread stays at normal priority: {e}")
+        if self.TICK_CPU is not None:
+            try:
+                os.sched_setaffinity(0, {self.TICK_CPU})
+            except (AttributeError, OSError) as e:
+                self._debug(f"Tick thread not pinned to CPU {self.TICK_CPU}: {e}")
+        if self.TICK_MLOCK:
+            try:
+                libc = ctypes.CDLL(None, use_errno=True)
+                if libc.mlockall(1 | 2) != 0:  # MCL_CURRENT | MCL_FUTURE
+                    self._debug(f"mlockall failed: {os.strerror(ctypes.get_errno())}")
+            except (AttributeError, OSError) as e:
+                self._debug(f"mlockall not available: {e}")
+        while True:
+            job = self._tick_queue.get()
+            func, args, stop, done, wait = job
+            try:
+                func(*args, stop=stop)
+            except Exception as e:
+                job.append(e)
+                if not wait:
+                    # nobody is waiting to re-raise it
+                    self._error(f"{func.__name__} failed on the tick thread: {e!r}")
+            finally:
+                done.set()
+
+    def _submit(self, func, *args, wait=True):
+        """
+        Run func(*args, stop=...) on the tick thread, or right here if there is none
+
+        :param func: _move, _action or _call
+        :type func: function
+        :param wait: block until func is done, otherwise return straight away
+        :type wait: bool
+        :return: with wait=False, an event that is set once func is done
+        :rtype: threading.Event
+        """
+        if self._tick_thread is None:
+            if wait:
+                func(*args)
+                return None
+            self._tick_queue = queue.Queue()
+            self._tick_thread = threading.Thread(target=self._tick_worker, daemon=True)
+            self._tick_thread.start()
+        stop = threading.Event()
+        done = threading.Event()
+        job = [func, args, stop, done, wait]
+        self._tick_queue.put(job)
+        if not wait:
+            return done
+        try:
+            done.wait()
+        except BaseException:
+            # interrupted (Ctrl-C): don't leave the move running behind our back
+            stop.set()
+            done.wait()
+            raise
+        if len(job) > 5:
+            raise job[5]
+        return None
+
+    def _must_queue(self):
+        """
+        True if a direct servo write has to go through the tick thread: once
+        there is one, writes from any other thread are queued behind the
+        moves still pending on it, rather than racing them on the bus
+        """
+        return self._tick_thread is not None and threading.current_thread() is not self._tick_thread
 
-        # print(f"usage1: {time.time() - st}")
-        # st = time.time()
+    def _call(self, func, *args, stop=None):
+        """Run func(*args) as a tick thread job, see _must_queue"""
+        func(*args)
 
-        # print(f"max_delta: {max_delta}, max_step: {max_step}")
-        for _ in range(max_step):
-            start_timer = time.time()
-            delay = step_time/1000
+    def _play(self, pulses, positions, stop=None):
+        """
+        Write precomputed rows of pulse width values to the servos, one row per tick
+
+        :param pulses: rows of servo pulse width values
+        :type pulses: list
+        :param positions: servo angles after each row
+        :type positions: list
+        :param stop: if given, the move ends early once this is set
+        :type stop: threading.Event
+        """
+        # Ticks are paced against absolute deadlines so the per-tick error
+        # doesn't accumulate. time.sleep() is only good to ~1 ms on a stock
+        # kernel, so sleep until SPIN_NS before the deadline and busy-wait the rest.
+        # locals: one LOAD_FAST each in the tick loop instead of attribute lookups
+        write_row = self._write_tick
+        monotonic_ns = time.monotonic_ns
+        sleep = time.sleep
+        spin_ns = self.SPIN_NS
+        step_ns = self.STEP_TIME * 1000000
+        deadline_ns = monotonic_ns()
+        k = -1
+        try:
+            for k in range(len(pulses)):
+                if stop is not None and stop.is_set():
+                    k -= 1
+                    break
+                tick_ns = deadline_ns
+                deadline_ns += step_ns
+
+                write_row(pulses[k], tick_ns)
+
+                now_ns = monotonic_ns()
+                if now_ns > deadline_ns:
+                    # overran a whole tick (stall, preemption): restart the schedule
+                    # from now rather than bursting the missed rows out back to back
+                    deadline_ns = now_ns
+                    continue
+                coarse = (deadline_ns - now_ns - spin_ns) / 1e9
+                if coarse > 0:
+                    sleep(coarse)
+                while monotonic_ns() < deadline_ns:
+                    pass
+        finally:
+            # keep tracking where the servos are, even if the move was interrupted
+            if k >= 0:
+                self.servo_positions = array.array('d', positions[k])
+                # the tick writer bypasses PWM.pulse_width, so record the last row written
+                for servo, value in zip(self.servo_list, pulses[k]):
+                    servo._pulse_width = value
+
+    def _move(self, targets, speed, bpm, stop=None):
+        """Plan a move from wherever the servos are now and play it, see servo_move"""
+        plan = self._plan_move(self.servo_positions, targets, speed, bpm)
+        if plan is None:
+            # already there (within a degree): no writes, no wait
+            return
+        traj, pulses = plan
+        # plain ints: cheaper to index and pass to pulse_width
+        self._play(pulses.tolist(), traj, stop)
 
-            for j in range(self.pin_num):
-                self.servo_positions[j] += steps[j]
-            self.servo_write_all(self.servo_positions)
+    def servo_move(self, targets, speed=50, bpm=None, wait=True):
+        """
+        Move servo to specific angles with speed or bpm
+
+        With wait=False the move is queued on the tick thread (started on
+        first use) and this returns at once; queued moves run in order, each
+        starting from where the previous one ended. Once the tick thread is
+        running, servo_write_all, servo_write_raw, reset, soft_reset and
+        calibration are queued on it too: they wait for any moves queued
+        before them, then write, so a later direct write always wins.
+
+        :param targets: list of servo angles
+        :type targets: list
+        :param speed: speed of servo move
+        :type speed: int or float
+        :param bpm: beats per minute
+        :type bpm: int or float
+        :param wait: block until the move is done
+        :type wait: bool
+        :return: with wait=False, an event that is set once the move is done
+        :rtype: threading.Event
+        """
+        if not wait:
+            targets = list(targets)  # the caller may reuse its list before we get to it
+        return self._submit(self._move, targets, speed, bpm, wait=wait)
 
-            servo_move_time = time.time() - start_timer
-            # print(f"Servo move: {servo_move_time}")
-            delay = delay - servo_move_time
-            delay = max(0, delay)
-            time.sleep(delay)
-            # _dealy_start = time.time()
-            # if delay > 0:
-            #     while (time.time() - _dealy_start < delay):
-            #         pass
-        # print(f"usage2: {time.time() - st}, max_steps: {max_step}")
-
-    def do_action(self, motion_name, step=1, speed=50):
+    def _plan_action(self, frames, speed):
+        """
+        Work out every tick of one pass through a preset action
+
+        :param frames: the action's servo angle frames, from move_list
+        :type frames: tuple
+        :param speed: speed of motion
+        :type speed: int or float
+        :return: (pulse widths, positions) rows for _play
+        :rtype: tuple
+        """
+        pulses = []
+        positions = []
+        current = list(self.servo_positions)
+        # one (frames, pin_num) array for the whole action rather than a conversion per frame
+        for motion in np.asarray(frames, dtype=float):
+            plan = self._plan_move(current, motion, speed)
+            if plan is None:
+                # already there: skipped, same as servo_move
+                continue
+            traj, rows = plan
+            pulses.extend(rows.tolist())
+            positions.extend(traj.tolist())
+            current = positions[-1]
+        return pulses, positions
+
+    def _action(self, motion_name, step, speed, stop=None):
+        """Play a preset action step times, see do_action"""
+        cache = self._action_cache
+        play = self._play
+        # the ticks depend on the action's frames, where the servos start and
+        # the calibration, so those are all part of the key; keying on the
+        # frames rather than the name means an edited move_list entry is
+        # planned afresh. Only the start changes from one step to the next.
+        frames = tuple(map(tuple, self.move_list[motion_name]))
+        calibration = (tuple(self.direction), tuple(self.origin_positions), tuple(self.offset))
+        for _ in range(step):
+            if stop is not None and stop.is_set():
+                break
+            key = (frames, speed, tuple(self.servo_positions), calibration)
+            sweep = cache.get(key)
+            if sweep is None:
+                if len(cache) >= self.ACTION_CACHE_SIZE:
+                    cache.clear()
+                sweep = cache[key] = self._plan_action(frames, speed)
+            play(*sweep, stop)
+
+    def do_action(self, motion_name, step=1, speed=50, wait=True):
         """
         Do prefix action with motion_name and step and speed
 
@@ -226,10 +564,12 @@ class Robot(_Basic_class):
         :type step: int
         :param speed: speed of motion
         :type speed: int or float
+        :param wait: block until the action is done, see servo_move
+        :type wait: bool
+        :return: with wait=False, an event that is set once the action is done
+        :rtype: threading.Event
         """
-        for _ in range(step):
-            for motion in self.move_list[motion_name]:
-                self.servo_move(motion, speed)
+        return self._submit(self._action, motion_name, step, speed, wait=wait)
 
     def set_offset(self, offset_list):
         """
@@ -238,18 +578,24 @@ class Robot(_Basic_class):
         :param offset_list: list of servo angles
         :type offset_list: list
         """
-        offset_list = [min(max(offset, -20), 20) for offset in offset_list]
+        offset_list = [-20 if offset < -20 else 20 if offset > 20 else offset for offset in offset_list]
         temp = str(offset_list)
         self.db.set(self.offset_value_name, temp)
-        self.offset = offset_list
+        self.offset = array.array('d', offset_list)
+        _offset_cache[self._offset_key] = tuple(self.offset)
+        self._action_cache.clear()
 
     def calibration(self):
         """Move all servos to home position"""
+        if self._must_queue():
+            return self._submit(self._call, self.calibration)
         self.servo_positions = self.calibrate_position
         self.servo_write_all(self.servo_positions)
 
     def reset(self, list=None):
         """Reset servo to original position"""
+        if self._must_queue():
+            return self._submit(self._call, self.reset, list)
         if list is None:
             self.servo_positions = self.new_list(0)
             self.servo_write_all(self.servo_positions)
@@ -258,5 +604,7 @@ class Robot(_Basic_class):
             self.servo_write_all(self.servo_positions)
 
     def soft_reset(self):
+        if self._must_queue():
+            return self._submit(self._call, self.soft_reset)
         temp_list = self.new_list(0)
         self.servo_write_all(temp_list)
@@ -1,6 +1,7 @@
 #!/usr/bin/env python3
 from .pwm import PWM
 from .utils import mapping
+import numpy as np
 
 
 class Servo(PWM):
@@ -41,6 +42,21 @@ class Servo(PWM):
         self._debug(f"Pulse width: {pulse_width_time}")
         self.pulse_width_time(pulse_width_time)
 
+    @classmethod
+    def angles_to_pulse_widths(cls, angles):
+        """
+        Convert many angles to pulse width values at once, the same way angle() does
+
+        :param angles: angles(-90~90), any shape
+        :type angles: array_like
+        :return: pulse width values to pass to pulse_width()
+        :rtype: numpy.ndarray
+        """
+        angles = np.clip(np.asarray(angles, dtype=float), -90, 90)
+        pulse_width_time = mapping(angles, -90, 90, cls.MIN_PW, cls.MAX_PW)
+        pulse_width_time = np.clip(pulse_width_time, cls.MIN_PW, cls.MAX_PW)
+        return (pulse_width_time / 20000 * cls.PERIOD).astype(int)
+
     def pulse_width_time(self, pulse_width_time):
         """
         Set the pulse width of the servo motor